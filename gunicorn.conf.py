@@ -0,0 +1,8 @@
+# Loaded automatically by `gunicorn app:app` (see Procfile).
+# Generation uses per-request RNG instances and read-only cached data, so one
+# process can safely serve many requests on threads.
+import os
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
@@ -1,5 +1,8 @@
+import os
+
 from flask import Flask
 from flask_cors import CORS  # 🧪 New import!
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 def create_app():
     app = Flask(__name__)
@@ -7,6 +10,40 @@ def create_app():
     # 🌐 Enable CORS for all routes and origins (restrict later if needed)
     CORS(app)
 
+    # 🛡️ Trust X-Forwarded-For only for the hops our own proxies add (0 = direct connections)
+    app.config["PROXY_HOPS"] = int(os.environ.get("SCROLLFORGE_PROXY_HOPS", 0))
+    if app.config["PROXY_HOPS"] > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["PROXY_HOPS"])
+
+    # ⏱️ Optional micro-batching of /generate and /custom_generate (0 = off)
+    app.config["MICROBATCH_WINDOW_MS"] = float(os.environ.get("SCROLLFORGE_MICROBATCH_WINDOW_MS", 0))
+    app.config["MICROBATCH_MAX_SIZE"] = int(os.environ.get("SCROLLFORGE_MICROBATCH_MAX_SIZE", 32))
+    timeout_ms = os.environ.get("SCROLLFORGE_MICROBATCH_TIMEOUT_MS")
+    app.config["MICROBATCH_TIMEOUT_MS"] = float(timeout_ms) if timeout_ms else None
+    if app.config["MICROBATCH_WINDOW_MS"] > 0:
+        from .batching import MicroBatcher
+        app.extensions["scrollforge_batcher"] = MicroBatcher(
+            window_ms=app.config["MICROBATCH_WINDOW_MS"],
+            max_batch=app.config["MICROBATCH_MAX_SIZE"],
+            timeout_ms=app.config["MICROBATCH_TIMEOUT_MS"]
+        )
+
+    # 🔍 Check every data cross-reference once at startup (python -m scrollforge.validation for the report)
+    from .validation import validate_data
+    app.extensions["scrollforge_validation"] = validate_data()
+
+    # 📚 Hash and pre-serialize every lore entry for /lore/export
+    from .lore_export import load_lore_manifest
+    load_lore_manifest()
+
+    # 🔤 Train the name_mode=markov models now rather than on the first request that asks
+    from .markov_names import load_name_models
+    load_name_models()
+
+    # 🚦 Cost-aware admission control: fail fast with 429/503 instead of queueing
+    from .admission import init_admission
+    init_admission(app)
+
     from .routes import main
     app.register_blueprint(main)
 
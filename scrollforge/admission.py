@@ -0,0 +1,191 @@
+import math
+import os
+import threading
+import time
+import logging
+from collections import OrderedDict
+
+from flask import request, g, jsonify
+
+from .routes import parse_batch_item, BATCH_MAX_ITEMS, BATCH_MAX_TOTAL
+
+logger = logging.getLogger(__name__)
+
+# Routes that are never throttled: they must stay fast while generation is saturated (keep README in sync)
+EXEMPT_PATHS = ("/", "/status", "/stats/batching")
+LORE_PREFIXES = ("/lore", "/race", "/class", "/faction", "/location")
+MAX_TRACKED_CLIENTS = 10000
+
+
+class TokenBucket:
+    """
+    Token bucket that may go into debt; `take` never blocks and reports how long to wait instead.
+    A request costing more than the bucket holds is admitted once the bucket is full and
+    charged in full, so the client then waits out the debt before its next request.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self, cost):
+        """Returns (admitted, retry_after_seconds)."""
+        required = min(cost, self.capacity)
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= required:
+                self.tokens -= cost
+                return True, 0.0
+            return False, (required - self.tokens) / self.rate
+
+
+class ClientBuckets:
+    """One TokenBucket per client key, evicting the least recently seen client past a cap."""
+
+    def __init__(self, rate, capacity, max_clients=MAX_TRACKED_CLIENTS):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, client_key, cost):
+        with self.lock:
+            bucket = self.buckets.get(client_key)
+            if bucket is None:
+                bucket = self.buckets[client_key] = TokenBucket(self.rate, self.capacity)
+                if len(self.buckets) > self.max_clients:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(client_key)
+        return bucket.take(cost)
+
+
+class ConcurrencyLimit:
+    """Caps in-flight requests of one class; full means fail fast, never queue."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.semaphore = threading.BoundedSemaphore(limit)
+
+    def try_acquire(self):
+        return self.semaphore.acquire(blocking=False)
+
+    def release(self):
+        self.semaphore.release()
+
+
+def client_key(api_keys):
+    """
+    The client's API key if it is one of the configured keys, else its IP.
+    Unknown keys are ignored so a client cannot mint fresh buckets by sending
+    random ones. The IP is remote_addr, which ProxyFix rewrites from the hops
+    added by trusted proxies (SCROLLFORGE_PROXY_HOPS); client-sent
+    X-Forwarded-For entries are never trusted.
+    """
+    api_key = request.headers.get("X-API-Key")
+    if api_key and api_key in api_keys:
+        return f"key:{api_key}"
+    return f"ip:{request.remote_addr}"
+
+
+def route_class(path):
+    if path in EXEMPT_PATHS:
+        return None
+    if path.startswith(LORE_PREFIXES):
+        return "lore"
+    return "generation"
+
+
+def request_cost(path):
+    """
+    Tokens a request costs: bulk and batch pay per character they will generate.
+    Requests the route is going to reject cost one token, so an absurd count
+    can never put a client into unbounded debt.
+    """
+    if path == "/generate/bulk":
+        try:
+            count = int(request.args.get("count", 4))
+        except ValueError:
+            return 1
+        return count if 1 <= count <= 100 else 1
+    if path == "/generate/batch":
+        items = request.get_json(silent=True)
+        if not isinstance(items, list) or len(items) > BATCH_MAX_ITEMS:
+            return 1
+        total = 0
+        for item in items:
+            # Same count and seed checks as the route; an invalid item generates nothing
+            try:
+                count, _, _ = parse_batch_item(item)
+            except ValueError:
+                continue
+            total += count
+        return total if 1 <= total <= BATCH_MAX_TOTAL else 1
+    return 1
+
+
+def reject(status, message, retry_after):
+    response = jsonify({"error": message})
+    response.status_code = status
+    response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def init_admission(app):
+    """Register per-client token buckets and per-class concurrency limits on the app."""
+    config = app.config
+    config.setdefault("ADMISSION_ENABLED", os.environ.get("SCROLLFORGE_ADMISSION", "1") != "0")
+    config.setdefault("ADMISSION_RATE", float(os.environ.get("SCROLLFORGE_ADMISSION_RATE", 50)))
+    config.setdefault("ADMISSION_BURST", float(os.environ.get("SCROLLFORGE_ADMISSION_BURST", 500)))
+    config.setdefault("GENERATION_CONCURRENCY", int(os.environ.get("SCROLLFORGE_GENERATION_CONCURRENCY", 6)))
+    config.setdefault("LORE_CONCURRENCY", int(os.environ.get("SCROLLFORGE_LORE_CONCURRENCY", 16)))
+    config.setdefault("ADMISSION_API_KEYS", frozenset(
+        key.strip() for key in os.environ.get("SCROLLFORGE_API_KEYS", "").split(",") if key.strip()
+    ))
+    if not config["ADMISSION_ENABLED"]:
+        return
+    if not config.get("PROXY_HOPS"):
+        # Behind a router every request arrives from the router's address, so all clients would share one bucket
+        logger.warning(
+            "Admission control keys clients by remote address but SCROLLFORGE_PROXY_HOPS is 0; "
+            "behind a proxy or platform router set it to the number of proxy hops"
+        )
+
+    # Separate buckets per class so a client draining its generation budget can still read lore
+    buckets = {
+        "generation": ClientBuckets(config["ADMISSION_RATE"], config["ADMISSION_BURST"]),
+        "lore": ClientBuckets(config["ADMISSION_RATE"], config["ADMISSION_BURST"])
+    }
+    limits = {
+        "generation": ConcurrencyLimit(config["GENERATION_CONCURRENCY"]),
+        "lore": ConcurrencyLimit(config["LORE_CONCURRENCY"])
+    }
+
+    @app.before_request
+    def admit():
+        kind = route_class(request.path)
+        if kind is None or request.method == "OPTIONS":
+            return None
+
+        admitted, retry_after = buckets[kind].take(client_key(config["ADMISSION_API_KEYS"]), request_cost(request.path))
+        if not admitted:
+            return reject(429, "Rate limit exceeded; slow down or use smaller batches", retry_after)
+
+        limit = limits[kind]
+        if not limit.try_acquire():
+            logger.warning(f"Shedding {request.path}: {kind} concurrency limit of {limit.limit} reached")
+            return reject(503, "Server is at capacity; retry shortly", 1)
+        g.admission_limit = limit
+        return None
+
+    @app.teardown_request
+    def release(exc=None):
+        limit = g.pop("admission_limit", None)
+        if limit is not None:
+            limit.release()
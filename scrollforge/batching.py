@@ -0,0 +1,139 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque, OrderedDict
+from concurrent.futures import Future, TimeoutError
+
+from .generator import generate_characters
+
+logger = logging.getLogger(__name__)
+
+RECENT_WAITS = 2048
+# Time one batch may take to generate before a waiting request gives up on it
+GENERATION_BUDGET_MS = 500
+
+
+class MicroBatcher:
+    """
+    Collects generate requests that arrive within `window_ms` of the first one
+    (or until `max_batch` are waiting) and generates them in one batched pass.
+    Only useful with threaded workers, where several requests wait at once.
+    """
+
+    def __init__(self, window_ms=2.0, max_batch=32, timeout_ms=None):
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        # A request waits out its own window, possibly one batch ahead of it, then generation
+        if timeout_ms is None:
+            timeout_ms = 2 * window_ms + GENERATION_BUDGET_MS
+        self.timeout = timeout_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self._metrics_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._max_seen = 0
+        self._timeouts = 0
+        self._size_histogram = {}
+        self._waits_ms = deque(maxlen=RECENT_WAITS)
+
+    def _ensure_started(self):
+        # Started lazily so the thread lives in the worker process, not a pre-fork master
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="scrollforge-microbatcher", daemon=True)
+                    self._thread.start()
+
+    def submit(self, overrides=None, seed=None):
+        """
+        Queue one character and block until its batch has been generated.
+        If the batch thread does not answer within the timeout, the character
+        is generated on the calling thread instead, so a stalled batcher never
+        holds requests indefinitely.
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((overrides, seed, time.monotonic(), future))
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Cancelled futures are skipped when the batcher reaches them
+            future.cancel()
+            with self._metrics_lock:
+                self._timeouts += 1
+            logger.warning(f"Micro-batch did not answer within {self.timeout * 1000:.0f} ms; generating directly")
+            return generate_characters([(overrides, seed)])[0]
+
+    def _collect(self):
+        first = self._queue.get()
+        batch = [first]
+        deadline = first[2] + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = [item for item in self._collect() if item[3].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            started = time.monotonic()
+            try:
+                results = generate_characters([(overrides, seed) for overrides, seed, _, _ in batch])
+            except Exception as e:
+                logger.exception("Micro-batch generation failed")
+                for _, _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, _, _, future), character in zip(batch, results):
+                future.set_result(character)
+            self._record(len(batch), [(started - enqueued) * 1000 for _, _, enqueued, _ in batch])
+
+    def _record(self, size, waits_ms):
+        with self._metrics_lock:
+            self._batches += 1
+            self._requests += size
+            self._max_seen = max(self._max_seen, size)
+            self._size_histogram[size] = self._size_histogram.get(size, 0) + 1
+            self._waits_ms.extend(waits_ms)
+
+    def metrics(self):
+        with self._metrics_lock:
+            waits = sorted(self._waits_ms)
+            histogram = dict(sorted(self._size_histogram.items()))
+            batches, requests, max_seen = self._batches, self._requests, self._max_seen
+            timeouts = self._timeouts
+
+        def pct(p):
+            return round(waits[min(len(waits) - 1, int(p / 100 * len(waits)))], 3) if waits else None
+
+        return OrderedDict([
+            ("enabled", True),
+            ("window_ms", self.window * 1000),
+            ("max_batch", self.max_batch),
+            ("timeout_ms", self.timeout * 1000),
+            ("batches", batches),
+            ("requests", requests),
+            ("mean_batch_size", round(requests / batches, 2) if batches else None),
+            ("max_batch_size", max_seen),
+            ("batch_size_histogram", histogram),
+            ("wait_ms", OrderedDict([
+                ("p50", pct(50)),
+                ("p95", pct(95)),
+                ("p99", pct(99)),
+                ("max", round(waits[-1], 3) if waits else None)
+            ])),
+            ("timeouts", timeouts),
+            ("queued", self._queue.qsize())
+        ])
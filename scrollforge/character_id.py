@@ -0,0 +1,88 @@
+import base64
+import hashlib
+import json
+import logging
+from pathlib import Path
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+
+ID_PREFIX = "v1"
+SEED_BITS = 64
+# Overrides looked up by name in the data files; they must always be strings
+LOOKUP_OVERRIDES = ("race", "class", "faction", "gender", "region", "place", "deity", "celestial_mark")
+# Bump whenever generate_character() consumes the RNG differently, so old ids
+# are refused with a snapshot mismatch instead of regenerating someone else
+GENERATOR_VERSION = 2
+
+
+@lru_cache(maxsize=1)
+def data_snapshot_version():
+    """
+    Short hash of every data file the generator reads.
+    Lore files are left out since they never change a generated character.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"generator:{GENERATOR_VERSION}".encode("utf-8"))
+    for path in sorted(DATA_DIR.glob("*.json")):
+        if path.name.startswith("lore_"):
+            continue
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:10]
+
+
+def encode_character_id(seed, overrides=None):
+    """
+    Build an id that fully describes a character: format version, data snapshot,
+    seed and (if any) the overrides it was generated with.
+    """
+    parts = [ID_PREFIX, data_snapshot_version(), f"{seed:016x}"]
+    if overrides:
+        payload = json.dumps(overrides, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        parts.append(base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("="))
+    return ".".join(parts)
+
+
+def decode_character_id(character_id):
+    """
+    Split an id back into (snapshot, seed, overrides).
+    Raises ValueError if the id is malformed.
+    """
+    parts = character_id.split(".")
+    if len(parts) not in (3, 4) or parts[0] != ID_PREFIX:
+        raise ValueError(f"Malformed character id: {character_id}")
+
+    snapshot, seed_hex = parts[1], parts[2]
+    try:
+        seed = int(seed_hex, 16)
+    except ValueError:
+        raise ValueError(f"Malformed character id: {character_id}")
+    if not 0 <= seed < 2 ** SEED_BITS:
+        raise ValueError(f"Malformed character id: {character_id}")
+
+    overrides = {}
+    if len(parts) == 4:
+        try:
+            padded = parts[3] + "=" * (-len(parts[3]) % 4)
+            overrides = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        except (ValueError, UnicodeError):
+            raise ValueError(f"Malformed character id: {character_id}")
+        if not isinstance(overrides, dict):
+            raise ValueError(f"Malformed character id: {character_id}")
+        for key, value in overrides.items():
+            if value is not None and not isinstance(value, (str, int, float, bool)):
+                raise ValueError(f"Character id override '{key}' must be a single value")
+            if key.lower() in LOOKUP_OVERRIDES and value is not None and not isinstance(value, str):
+                raise ValueError(f"Character id override '{key}' must be a string")
+
+    return snapshot, seed, overrides
+
+
+def parse_seed(value):
+    """Parse a client-supplied seed; raises ValueError if it is not a 64-bit unsigned integer."""
+    seed = int(value)
+    if not 0 <= seed < 2 ** SEED_BITS:
+        raise ValueError(f"Seed must be between 0 and {2 ** SEED_BITS - 1}")
+    return seed
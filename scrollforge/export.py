@@ -0,0 +1,219 @@
+"""
+Offline dataset export.
+
+Generates characters straight from the generator (no HTTP) and writes them to
+NDJSON or CSV shards. Every shard has its own seed derived from the run seed,
+so re-running with the same arguments reproduces the same files, and shards
+that already exist on disk are skipped so an interrupted run can be resumed.
+
+    python -m scrollforge.export --count 1000000 --out ./export --format ndjson
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+from .character_id import data_snapshot_version
+from .generator import generate_character
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+PROGRESS_EVERY = 1000
+REPORT_INTERVAL = 2.0
+
+_progress_counter = None
+
+
+def shard_seed(seed, index):
+    """Derive a stable per-shard seed from the run seed and the shard index."""
+    digest = hashlib.sha256(f"{seed}:{index}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def shard_path(out_dir, index, fmt):
+    return Path(out_dir) / f"shard-{index:05d}.{fmt}"
+
+
+def flatten_character(character, prefix=""):
+    """Flatten nested character dicts into dotted CSV columns; lists are joined with '; '."""
+    flat = {}
+    for key, value in character.items():
+        column = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_character(value, prefix=f"{column}."))
+        elif isinstance(value, list):
+            flat[column] = "; ".join(str(v) for v in value)
+        else:
+            flat[column] = value
+    return flat
+
+
+def csv_columns():
+    """Column order for CSV shards, taken from the shape of a generated character."""
+    return list(flatten_character(generate_character(rng=random.Random(0))).keys())
+
+
+def generate_rows(count, seed):
+    """Yield `count` characters using a deterministic seed."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield generate_character(rng=rng)
+
+
+def _init_worker(counter):
+    global _progress_counter
+    _progress_counter = counter
+
+
+def _report_progress(rows):
+    if _progress_counter is not None:
+        with _progress_counter.get_lock():
+            _progress_counter.value += rows
+
+
+def write_shard(task):
+    """Write one shard to a temporary file and atomically move it into place."""
+    index, count, seed, out_dir, fmt, columns = task
+    final_path = shard_path(out_dir, index, fmt)
+    part_path = final_path.with_name(final_path.name + ".part")
+
+    pending = 0
+    with part_path.open("w", encoding="utf-8", newline="") as file:
+        writer = None
+        if fmt == "csv":
+            writer = csv.DictWriter(file, fieldnames=columns, extrasaction="ignore", restval="")
+            writer.writeheader()
+
+        for row, character in enumerate(generate_rows(count, shard_seed(seed, index))):
+            if "error" in character:
+                # Never write an error object as a data row; the shard is rerun once the cause is fixed
+                file.close()
+                part_path.unlink()
+                raise ValueError(f"Shard {index} failed at row {row}: {character['error']}")
+            if writer:
+                writer.writerow(flatten_character(character))
+            else:
+                file.write(json.dumps(character, ensure_ascii=False))
+                file.write("\n")
+
+            pending += 1
+            if pending == PROGRESS_EVERY:
+                _report_progress(pending)
+                pending = 0
+
+    _report_progress(pending)
+    os.replace(part_path, final_path)
+    return index
+
+
+def load_or_create_manifest(out_dir, settings):
+    """Record run settings so a resumed run cannot silently mix incompatible shards."""
+    path = Path(out_dir) / MANIFEST_NAME
+    if path.exists():
+        with path.open("r", encoding="utf-8") as file:
+            existing = json.load(file)
+        if existing != settings:
+            raise ValueError(
+                f"{path} was written with different settings {existing}; "
+                f"use a new output directory or the same arguments to resume"
+            )
+        return existing
+
+    with path.open("w", encoding="utf-8") as file:
+        json.dump(settings, file, indent=2)
+    return settings
+
+
+def plan_shards(count, shard_size):
+    shards = []
+    remaining = count
+    index = 0
+    while remaining > 0:
+        size = min(shard_size, remaining)
+        shards.append((index, size))
+        remaining -= size
+        index += 1
+    return shards
+
+
+def run_export(count, out_dir, fmt="ndjson", shard_size=100000, seed=0, workers=None, stream=sys.stderr):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # The snapshot covers the data files and GENERATOR_VERSION: shards from different ones must not mix
+    settings = {"count": count, "shard_size": shard_size, "seed": seed, "format": fmt,
+                "snapshot": data_snapshot_version()}
+    load_or_create_manifest(out_dir, settings)
+
+    columns = csv_columns() if fmt == "csv" else None
+    shards = plan_shards(count, shard_size)
+    todo = [
+        (index, size, seed, str(out_dir), fmt, columns)
+        for index, size in shards
+        if not shard_path(out_dir, index, fmt).exists()
+    ]
+    skipped = len(shards) - len(todo)
+    if skipped:
+        print(f"Resuming: {skipped} of {len(shards)} shards already complete", file=stream)
+    if not todo:
+        return 0
+
+    total_rows = sum(task[1] for task in todo)
+    counter = multiprocessing.Value("q", 0)
+    started = time.monotonic()
+    workers = workers or os.cpu_count() or 1
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(counter,)) as pool:
+        results = pool.imap_unordered(write_shard, todo)
+        finished = 0
+        while finished < len(todo):
+            try:
+                results.next(timeout=REPORT_INTERVAL)
+                finished += 1
+            except multiprocessing.TimeoutError:
+                pass
+            done = counter.value
+            elapsed = max(time.monotonic() - started, 1e-9)
+            print(
+                f"{done}/{total_rows} rows, {finished}/{len(todo)} shards, {done / elapsed:,.0f} rows/sec",
+                file=stream
+            )
+
+    return total_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m scrollforge.export",
+        description="Generate characters offline into NDJSON or CSV shards."
+    )
+    parser.add_argument("--count", type=int, required=True, help="total number of characters")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--shard-size", type=int, default=100000, help="characters per shard file")
+    parser.add_argument("--seed", type=int, default=0, help="run seed; the same seed reproduces the same shards")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--log-level", default="ERROR", help="logging level for generator warnings")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper())
+
+    if args.count < 1 or args.shard_size < 1:
+        parser.error("--count and --shard-size must be positive")
+
+    try:
+        run_export(args.count, args.out, args.format, args.shard_size, args.seed, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
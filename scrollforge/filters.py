@@ -1,8 +1,9 @@
 import json
-import random
 import logging
 from pathlib import Path
 from functools import lru_cache
+from .records import intern_strings, to_records, record_memory
+from .rng import thread_rng
 
 logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).resolve().parent
@@ -11,13 +12,14 @@ BASE_DIR = Path(__file__).resolve().parent
 def load_rules():
     path = BASE_DIR / 'data' / 'rules.json'
     with path.open('r', encoding='utf-8') as file:
-        return json.load(file)
+        return record_memory('rules.json', intern_strings(json.load(file), freeze=True))
 
 @lru_cache(maxsize=4)
 def load_factions():
     path = BASE_DIR / 'data' / 'factions.json'
     with path.open('r', encoding='utf-8') as file:
-        return json.load(file)
+        factions = to_records("Faction", intern_strings(json.load(file), freeze=True))
+    return record_memory('factions.json', factions)
 
 
 def is_valid_combo(race, faction, location, rules):
@@ -102,8 +104,14 @@ def is_faction_conflicted(faction_name, selected_factions):
     return faction_name in selected_factions
 
 
-def select_faction(race, char_class, factions, rules, override_faction_name=None):
-    candidates = get_valid_faction_candidates(race, char_class, factions, rules)
+def select_faction(race, char_class, factions, rules, override_faction_name=None, rng=None, candidates=None):
+    """`candidates` may be passed precomputed (see validation.py); empty pools were already reported there."""
+    rng = rng or thread_rng()
+    precomputed = candidates is not None
+    if precomputed:
+        candidates = list(candidates)
+    else:
+        candidates = get_valid_faction_candidates(race, char_class, factions, rules)
 
     if override_faction_name:
         override = next((f for f in factions if f["name"] == override_faction_name), None)
@@ -111,8 +119,8 @@ def select_faction(race, char_class, factions, rules, override_faction_name=None
             return override
 
     if not candidates:
-        # Optional: Log a warning for debugging
-        logger.warning(f"No valid faction candidates found for race {race['name']} and class {char_class['name']}")
+        if not precomputed:
+            logger.warning(f"No valid faction candidates found for race {race['name']} and class {char_class['name']}")
         return {
             "name": "Unaffiliated",
             "description": "A lone wanderer with no faction ties.",
@@ -120,15 +128,16 @@ def select_faction(race, char_class, factions, rules, override_faction_name=None
             "neutral": True
         }
 
-    random.shuffle(candidates)
+    rng.shuffle(candidates)
     used_names = [f["name"] for f in candidates]
     for candidate in candidates:
         if not is_faction_conflicted(candidate["name"], used_names):
             return candidate
 
-    return random.choice(candidates)  # fallback ONLY within valid candidates
+    return rng.choice(candidates)  # fallback ONLY within valid candidates
 
 
-def get_compatible_place(location, race, rules):
+def get_compatible_place(location, race, rules, rng=None):
     # Hook for future location-level filtering (e.g., sub-place restrictions)
-    return random.choice(location.get("major_places", [])) if location.get("major_places") else None
+    rng = rng or thread_rng()
+    return rng.choice(location.get("major_places", [])) if location.get("major_places") else None
@@ -1,11 +1,13 @@
 import json
-import random
-import uuid
 import logging
 from collections import OrderedDict
 from pathlib import Path
 from functools import lru_cache
 from .filters import select_faction
+from .records import intern_strings, to_records, to_plain, record_memory
+from .rng import thread_rng, request_rng
+from .character_id import encode_character_id, SEED_BITS, LOOKUP_OVERRIDES
+from .markov_names import synthesize_name
 
 from .filters import (
     load_rules,
@@ -14,8 +16,7 @@ from .filters import (
     filter_valid_origins,
     filter_deities_by_race,
     filter_names_by_race,
-    get_compatible_place,
-    get_faction_relationships
+    get_compatible_place
 )
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,24 @@ logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / 'data'
 
+NAME_MODES = ("list", "markov")
+
+# Height/weight adjustment per gender label; labels not listed here get none
+GENDER_BODY_MODIFIERS = {
+    "Female": {"height_mod": -5, "weight_mod": -10},
+    "Male": {"height_mod": 0, "weight_mod": 0}
+}
+NO_BODY_MODIFIERS = {"height_mod": 0, "weight_mod": 0}
+NO_RELATIONSHIPS = {"allies": (), "rivals": ()}
+
+# Hot files kept as compact slotted records instead of plain dicts
+RECORD_FILES = {
+    "races.json": "Race",
+    "classes.json": "CharacterClass",
+    "locations.json": "Location",
+    "follower.json": "Follower"
+}
+
 @lru_cache(maxsize=32)
 def load_json(filename):
     path = DATA_DIR / filename
@@ -31,13 +50,58 @@ def load_json(filename):
         raise FileNotFoundError(f"Required data file not found: {path}")
     try:
         with path.open('r', encoding='utf-8') as file:
-            return json.load(file)
+            data = intern_strings(json.load(file), freeze=True)
+        if filename in RECORD_FILES:
+            data = to_records(RECORD_FILES[filename], data)
+        return record_memory(filename, data)
     except Exception as e:
         logger.exception(f"Failed to load JSON from: {path}")
         return {}
 
-def get_random_item(data, key=None):
-    item = random.choice(data)
+def group_by_canonical(content, canonical_names):
+    """
+    Re-key content on canonical names (case-insensitive match) as immutable tuples.
+    Keys that match no canonical name are dropped.
+    """
+    lookup = {n.lower(): n for n in canonical_names}
+    grouped = {}
+    for key, values in content:
+        canonical = lookup.get(str(key).lower())
+        if canonical:
+            grouped.setdefault(canonical, []).extend(values)
+    return {k: tuple(v) for k, v in grouped.items()}
+
+@lru_cache(maxsize=1)
+def load_content_pools():
+    """
+    Group every class- and race-keyed content file into tuples keyed by the
+    canonical class or race name, once, and report names with no content.
+    """
+    class_names = [c["name"] for c in load_json('classes.json')]
+    race_names = [r["name"] for r in load_json('races.json')]
+    quotes = load_json('quotes.json')
+
+    pools = {
+        "quotes": group_by_canonical(((q.get("class"), [q["quote"]]) for q in quotes), class_names),
+        "titles": group_by_canonical(load_json('titles.json').items(), class_names),
+        "fighting_styles": group_by_canonical(load_json('fighting_styles.json').items(), class_names),
+        "backstories": group_by_canonical(load_json('backstories.json').items(), class_names),
+        "names": group_by_canonical(load_json('names.json').items(), race_names)
+    }
+
+    missing = {}
+    for pool_name, pool in pools.items():
+        expected = race_names if pool_name == "names" else class_names
+        absent = [n for n in expected if not pool.get(n)]
+        if absent:
+            missing[pool_name] = absent
+            logger.warning(f"No {pool_name} for: {', '.join(absent)}; these will use fallback values")
+    pools["missing"] = missing
+
+    return pools
+
+def get_random_item(data, key=None, rng=None):
+    item = (rng or thread_rng()).choice(data)
     if key and isinstance(item, dict):
         return item.get(key, "Unknown")
     return item
@@ -56,36 +120,30 @@ def sanitize_article_collisions(template, context):
                             break
     return context
 
-def generate_backstory(context):
-    backstories = load_json("backstories.json")
+def generate_backstory(context, rng=None, templates=None):
+    """
+    `templates` is the validated pool for the class (see validation.py), where every
+    template is known to format against a generator context, so no fallback is needed.
+    """
+    rng = rng or thread_rng()
     class_name = context["class"]
-    class_name_lower = class_name.lower()
-    normalized_backstories = {k.lower(): v for k, v in backstories.items()}
-    if class_name_lower not in normalized_backstories:
+    if templates is None:
+        from .validation import validate_data
+        templates = validate_data().backstories.get(class_name)
+    if not templates:
         return f"No backstories available for class: {class_name}"
-    template = random.choice(normalized_backstories[class_name_lower])
+    template = rng.choice(templates)
     context = sanitize_article_collisions(template, context)
-    try:
-        return template.format(**context)
-    except Exception as e:
-        logger.warning(f"Backstory template error: {e}")
-        return (
-            f"A Dragon Break fractured the tale...{context.get('name', 'This soul')} "
-            f"has a mysterious past, veiled in lost time."
-        )
+    return template.format(**context)
 
-def generate_height_weight(race_name, class_name, gender_label="Unknown"):
+def generate_height_weight(race_name, class_name, gender_label="Unknown", rng=None):
+    rng = rng or thread_rng()
     body_metrics = load_json("body_metrics.json")
     class_mods = load_json("class_modifiers.json")
     race_data = body_metrics.get(race_name, {})
     class_data = class_mods.get(class_name, {"height_mod": 0, "weight_mod": 0})
-    gender_mods = {
-        "Female": {"height_mod": -5, "weight_mod": -10},
-        "Male": {"height_mod": 0, "weight_mod": 0}
-    }.get(gender_label, {"height_mod": 0, "weight_mod": 0})
-
-    if gender_label not in ["Male", "Female"]:
-        logger.warning(f"Unknown gender label: {gender_label}")
+    # Labels without modifiers are reported once by validation.py, not per call
+    gender_mods = GENDER_BODY_MODIFIERS.get(gender_label, NO_BODY_MODIFIERS)
 
     height_min, height_max = race_data.get("height", [160, 180])
     weight_min, weight_max = race_data.get("weight", [60, 80])
@@ -94,8 +152,8 @@ def generate_height_weight(race_name, class_name, gender_label="Unknown"):
     weight_min += class_data["weight_mod"] + gender_mods["weight_mod"]
     weight_max += class_data["weight_mod"] + gender_mods["weight_mod"]
 
-    height = random.randint(height_min, height_max)
-    weight = random.randint(weight_min, weight_max)
+    height = rng.randint(height_min, height_max)
+    weight = rng.randint(weight_min, weight_max)
     bmi = weight / ((height / 100) ** 2)
 
     if bmi > 28:
@@ -113,104 +171,188 @@ def find_region_by_place(locations, place_name):
                 return loc
     return None
 
-def generate_character(overrides=None):
+def match_case_insensitive(options, target):
+    if not target:
+        return None
+    target_lower = target.lower()
+    return next((opt for opt in options if opt["name"].lower() == target_lower), None)
+
+def match_label_case_insensitive(options, target):
+    if not target:
+        return None
+    target_lower = target.lower()
+    return next((opt for opt in options if opt.get("label", "").lower() == target_lower), None)
+
+def resolve_overrides(overrides=None):
+    """
+    Normalize override keys and look up every named override against the data files.
+    Raises ValueError for overrides that can never produce a character.
+    """
+    races = load_json('races.json')
+    classes = load_json('classes.json')
+    locations = load_json('locations.json')
+    factions = load_factions()
+    celestial_marks = load_json('celestial_marks.json')
+    genders = load_json('gender.json')
+    followers = load_json('follower.json')
+
+    # --- Normalize all override values to support case-insensitivity ---
+    normalized_overrides = {k.lower(): v for k, v in (overrides or {}).items()}
+    for key in LOOKUP_OVERRIDES:
+        value = normalized_overrides.get(key)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"Override '{key}' must be a string, got: {value!r}")
+
+    region_name = normalized_overrides.get("region")
+    place = normalized_overrides.get("place")
+    location = None
+    if place:
+        location = find_region_by_place(locations, place)
+        if not location:
+            raise ValueError(f"Unknown place: {place}")
+    elif region_name:
+        location = next((loc for loc in locations if loc["name"].lower() == region_name.lower()), None)
+        if not location:
+            raise ValueError(f"Unknown region: {region_name}")
+
+    deity_override = normalized_overrides.get("deity")
+    follower = None
+    if deity_override:
+        follower = next((f for f in followers if f["deity"].lower() == deity_override.lower()), None)
+        if not follower:
+            raise ValueError(f"Unknown deity: {deity_override}")
+
+    name_mode = str(normalized_overrides.get("name_mode", "list")).lower()
+    if name_mode not in NAME_MODES:
+        raise ValueError(f"Unknown name_mode: {name_mode} (expected one of {', '.join(NAME_MODES)})")
+
+    try:
+        age = int(normalized_overrides.get("age", -1))
+    except (TypeError, ValueError):
+        raise ValueError(f"Age must be an integer, got: {normalized_overrides.get('age')}")
+
+    return {
+        "overrides": normalized_overrides,
+        "force_random": normalized_overrides.get("allow_randomness") == True,
+        "race": match_case_insensitive(races, normalized_overrides.get("race")),
+        "class": match_case_insensitive(classes, normalized_overrides.get("class")),
+        "location": location,
+        "place": place,
+        "gender": match_label_case_insensitive(genders, normalized_overrides.get("gender")),
+        "follower": follower,
+        "faction": match_case_insensitive(factions, normalized_overrides.get("faction")),
+        "celestial_mark": match_case_insensitive(celestial_marks, normalized_overrides.get("celestial_mark")),
+        "age": age,
+        "name_mode": name_mode,
+        "exclude_existing_names": str(normalized_overrides.get("exclude_existing", "")).lower() in ("1", "true", "yes")
+    }
+
+@lru_cache(maxsize=1)
+def load_generation_data():
+    """Everything generate_character() reads, fetched once instead of per call."""
+    # Imported here: validation imports this module
+    from .validation import validate_data
+    return {
+        "rules": load_rules(),
+        "races": load_json('races.json'),
+        "classes": load_json('classes.json'),
+        "locations": load_json('locations.json'),
+        "factions": load_factions(),
+        "celestial_marks": load_json('celestial_marks.json'),
+        "favorite_dishes": load_json('favorite_dishes.json'),
+        "pools": load_content_pools(),
+        "genders": load_json('gender.json'),
+        "ages": load_json('age.json'),
+        "followers": load_json('follower.json'),
+        "checked": validate_data()
+    }
+
+def generate_character(overrides=None, resolved=None, rng=None, seed=None, data=None):
+    """
+    Generate one character. The character is a pure function of its seed, its
+    overrides and the data snapshot, and its id encodes all three so it can be
+    regenerated later. Without a seed one is drawn from `rng` (or fresh entropy).
+    Each call gets its own Random instance, so threads never share RNG state.
+    """
+    if seed is None:
+        seed = (rng or request_rng()).getrandbits(SEED_BITS)
+    rng = request_rng(seed)
     try:
-        rules = load_rules()
-        races = load_json('races.json')
-        classes = load_json('classes.json')
-        locations = load_json('locations.json')
-        factions = load_factions()
-        celestial_marks = load_json('celestial_marks.json')
-        names_data = load_json('names.json')
-        fighting_styles = load_json('fighting_styles.json')
-        favorite_dishes = load_json('favorite_dishes.json')
-        quotes = load_json('quotes.json')
-        titles = load_json('titles.json')
-        genders = load_json('gender.json')
-        ages_data = load_json('age.json')
-        followers = load_json('follower.json')
-
-        overrides = overrides or {}
+        data = data or load_generation_data()
+        rules = data["rules"]
+        races = data["races"]
+        classes = data["classes"]
+        locations = data["locations"]
+        factions = data["factions"]
+        celestial_marks = data["celestial_marks"]
+        favorite_dishes = data["favorite_dishes"]
+        pools = data["pools"]
+        genders = data["genders"]
+        ages_data = data["ages"]
+        followers = data["followers"]
+        checked = data["checked"]
+
+        # Callers generating many characters from one spec resolve it once up front
+        resolved = resolved or resolve_overrides(overrides)
+        normalized_overrides = resolved["overrides"]
         MAX_ATTEMPTS = 10
-        force_random = overrides.get("allow_randomness") == True
-
-        for attempt in range(MAX_ATTEMPTS):
-            is_lore_compliant = not force_random and random.random() < 0.90
-
-        # --- Normalize all override values to support case-insensitivity ---
-        normalized_overrides = {k.lower(): v for k, v in overrides.items()}
-
-        # Also ensure all string values are properly cased if expected
-        def match_case_insensitive(options, target):
-            if not target:
-                return None
-            target_lower = target.lower()
-            return next((opt for opt in options if opt["name"].lower() == target_lower), None)
-
-        def match_label_case_insensitive(options, target):
-            if not target:
-                return None
-            target_lower = target.lower()
-            return next((opt for opt in options if opt.get("label", "").lower() == target_lower), None)
+        force_random = resolved["force_random"]
 
         for attempt in range(MAX_ATTEMPTS):
-            is_lore_compliant = not force_random and random.random() < 0.90
+            is_lore_compliant = not force_random and rng.random() < 0.90
 
-            race = match_case_insensitive(races, normalized_overrides.get("race")) or get_random_item(races)
+            race = resolved["race"] or get_random_item(races, rng=rng)
 
-            char_class_name = normalized_overrides.get("class")
-            char_class = match_case_insensitive(classes, char_class_name)
+            char_class = resolved["class"]
             if not char_class:
                 filtered_classes = filter_valid_classes(race, classes, rules) if is_lore_compliant else classes
-                char_class = get_random_item(filtered_classes)
+                char_class = get_random_item(filtered_classes, rng=rng)
 
             filtered_origins = filter_valid_origins(race, locations, rules) if is_lore_compliant else locations
             filtered_followers = filter_deities_by_race(race, followers, rules) if is_lore_compliant else followers
 
-            region_name = normalized_overrides.get("region")
-            place = normalized_overrides.get("place")
-
-            location = find_region_by_place(locations, place) if place else (
-                next((loc for loc in locations if loc["name"].lower() == region_name.lower()), None)
-                if region_name else get_random_item(filtered_origins)
-            )
+            place = resolved["place"]
+            location = resolved["location"] or get_random_item(filtered_origins, rng=rng)
 
             if not place:
-                place = get_compatible_place(location, race, rules) or random.choice([
+                place = get_compatible_place(location, race, rules, rng=rng) or rng.choice([
                     "a remote village", "an ancient ruin", "a forgotten outpost"
                 ])
 
-            filtered_names = filter_names_by_race(race, names_data)
-            name = normalized_overrides.get("name") or random.choice(filtered_names)
-            gender = match_label_case_insensitive(genders, normalized_overrides.get("gender")) or get_random_item(genders)
+            filtered_names = filter_names_by_race(race, pools["names"])
+            name = normalized_overrides.get("name")
+            if not name and resolved["name_mode"] == "markov":
+                name = synthesize_name(race["name"], rng, exclude_existing=resolved["exclude_existing_names"])
+            elif not name:
+                name = rng.choice(filtered_names)
+            gender = resolved["gender"] or get_random_item(genders, rng=rng)
+            follower = resolved["follower"] or get_random_item(filtered_followers, rng=rng)
 
-            deity_override = normalized_overrides.get("deity")
-            follower = next((f for f in followers if f["deity"].lower() == deity_override.lower()), None) if deity_override else get_random_item(filtered_followers)
+            height_cm, weight_kg = generate_height_weight(race["name"], char_class["name"], gender["label"], rng=rng)
 
-            height_cm, weight_kg = generate_height_weight(race["name"], char_class["name"], gender["label"])
-
-            faction_override = normalized_overrides.get("faction")
-            faction = match_case_insensitive(factions, faction_override) or select_faction(race, char_class, factions, rules)
+            faction = resolved["faction"] or select_faction(
+                race, char_class, factions, rules, rng=rng,
+                candidates=checked.faction_candidates.get((race["name"], char_class["name"]))
+            )
 
-            age = int(normalized_overrides.get("age", -1))
+            age = resolved["age"]
             if 0 <= age:
-                selected_age_group = next((a for a in ages_data if a["min"] <= age <= a["max"]), random.choice(ages_data))
+                selected_age_group = next((a for a in ages_data if a["min"] <= age <= a["max"]), rng.choice(ages_data))
             else:
-                selected_age_group = random.choice(ages_data)
-                age = random.randint(selected_age_group["min"], selected_age_group["max"])
-
-            celestial_mark = match_case_insensitive(celestial_marks, normalized_overrides.get("celestial_mark")) or get_random_item(celestial_marks)
-            class_fighting_styles = fighting_styles.get(char_class["name"], [])
-            fighting_style = normalized_overrides.get("fighting_style") or (get_random_item(class_fighting_styles) if class_fighting_styles else "Improvised brawling")
-            dish = normalized_overrides.get("favorite_dish") or get_random_item(favorite_dishes)
-            class_quotes = [q["quote"] for q in quotes if q.get("class") == char_class["name"]]
-            quote = normalized_overrides.get("quote") or (get_random_item(class_quotes) if class_quotes else "...")
-            class_title_key = char_class["name"].capitalize()
-            title_pool = titles.get(class_title_key, [])
-            title = normalized_overrides.get("title") or (get_random_item(title_pool) if title_pool else "The Nameless")
-
-            relationships = get_faction_relationships(faction["name"], factions)
-            character_id = str(uuid.uuid4())
+                selected_age_group = rng.choice(ages_data)
+                age = rng.randint(selected_age_group["min"], selected_age_group["max"])
+
+            celestial_mark = resolved["celestial_mark"] or get_random_item(celestial_marks, rng=rng)
+            class_fighting_styles = pools["fighting_styles"].get(char_class["name"])
+            fighting_style = normalized_overrides.get("fighting_style") or (get_random_item(class_fighting_styles, rng=rng) if class_fighting_styles else "Improvised brawling")
+            dish = normalized_overrides.get("favorite_dish") or get_random_item(favorite_dishes, rng=rng)
+            class_quotes = pools["quotes"].get(char_class["name"])
+            quote = normalized_overrides.get("quote") or (get_random_item(class_quotes, rng=rng) if class_quotes else "...")
+            title_pool = pools["titles"].get(char_class["name"])
+            title = normalized_overrides.get("title") or (get_random_item(title_pool, rng=rng) if title_pool else "The Nameless")
+
+            relationships = checked.faction_relationships.get(faction["name"], NO_RELATIONSHIPS)
+            character_id = encode_character_id(seed, normalized_overrides)
 
             context = {
                 "id": character_id,
@@ -233,7 +375,7 @@ def generate_character(overrides=None):
                 "pronouns": gender["pronouns"]
             }
 
-            backstory = generate_backstory(context)
+            backstory = generate_backstory(context, rng=rng, templates=checked.backstories.get(char_class["name"], ()))
 
             return OrderedDict([
                 ("id", character_id),
@@ -248,22 +390,22 @@ def generate_character(overrides=None):
                     "height_cm": height_cm,
                     "weight_kg": weight_kg
                 }),
-                ("race", race),
+                ("race", to_plain(race)),
                 ("celestial_mark", celestial_mark),
-                ("follower", follower),
+                ("follower", to_plain(follower)),
                 ("origin", {
                     "name": location["name"],
                     "place": place,
                     "description": location["description"],
                     "region_type": location.get("region_type"),
-                    "environment": location.get("environment", [])
+                    "environment": to_plain(location.get("environment", []))
                 }),
-                ("class", char_class),
+                ("class", to_plain(char_class)),
                 ("faction", {
                     "name": faction["name"],
                     "description": faction["description"],
-                    "allies": relationships["allies"],
-                    "rivals": relationships["rivals"],
+                    "allies": to_plain(relationships["allies"]),
+                    "rivals": to_plain(relationships["rivals"]),
                     "alignment": faction.get("alignment")
                 }),
                 ("fighting_style", fighting_style),
@@ -279,3 +421,27 @@ def generate_character(overrides=None):
         return OrderedDict([
             ("error", "Something went wrong during character generation.")
         ])
+
+def generate_characters(requests):
+    """
+    Generate a group of characters in one pass. `requests` is a list of
+    (overrides, seed) pairs; data is fetched once and each distinct set of
+    overrides is resolved once. Results come back in request order.
+    """
+    data = load_generation_data()
+    resolved_specs = {}
+    characters = []
+    for overrides, seed in requests:
+        spec = json.dumps(overrides or {}, sort_keys=True, default=str)
+        if spec not in resolved_specs:
+            try:
+                resolved_specs[spec] = resolve_overrides(overrides)
+            except ValueError:
+                # Let generate_character() produce its usual error response
+                resolved_specs[spec] = None
+        resolved = resolved_specs[spec]
+        if resolved is None:
+            characters.append(generate_character(overrides=overrides, seed=seed))
+        else:
+            characters.append(generate_character(resolved=resolved, seed=seed, data=data))
+    return characters
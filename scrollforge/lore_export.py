@@ -0,0 +1,113 @@
+"""
+Full lore export with incremental sync.
+
+Every formatted lore entry gets a content hash when the manifest is built at
+startup, and the snapshot version is a short digest of all of them. A client
+that still holds the current version gets only a header back. Otherwise it
+can POST the {key: hash} map it already has and receive just the entries that
+were added or changed, with no history kept on the server.
+"""
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+
+from .lore_utils import (
+    load_lore_file,
+    format_race_lore_entry,
+    format_class_lore_entry,
+    format_faction_lore_entry,
+    format_location_lore_entry
+)
+
+logger = logging.getLogger(__name__)
+
+VERSION_PREFIX = "l2"
+HASH_CHARS = 16
+
+
+def iter_formatted_lore():
+    """Yield (lore_type, name, formatted) for every lore entry, formatted as the single-entry routes do."""
+    for name, entry in (load_lore_file("race") or {}).items():
+        yield "race", name, format_race_lore_entry(name, entry)
+    for entry in load_lore_file("class") or []:
+        name = entry.get("name", "Unknown Class")
+        yield "class", name, format_class_lore_entry(name, entry)
+    for entry in load_lore_file("faction") or []:
+        name = entry.get("name", "Unknown Faction")
+        yield "faction", name, format_faction_lore_entry(name, entry)
+    for entry in load_lore_file("location") or []:
+        yield "location", entry.get("region_name", "Unknown Location"), format_location_lore_entry(entry)
+
+
+def digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:HASH_CHARS]
+
+
+@lru_cache(maxsize=1)
+def load_lore_manifest():
+    """
+    Hash and pre-serialize every lore entry once.
+    Returns the snapshot version and a tuple of (key, content hash, ndjson line).
+    """
+    entries = []
+    for lore_type, name, formatted in iter_formatted_lore():
+        key = f"{lore_type}:{name}"
+        content_hash = digest(json.dumps(formatted, sort_keys=True, ensure_ascii=False))
+        line = json.dumps(OrderedDict([
+            ("type", "entry"),
+            ("key", key),
+            ("lore_type", lore_type),
+            ("name", name),
+            ("hash", content_hash),
+            ("data", formatted)
+        ]), ensure_ascii=False)
+        entries.append((key, content_hash, line))
+
+    entries.sort(key=lambda e: e[0])
+    version = f"{VERSION_PREFIX}.{digest(''.join(f'{key}={content_hash};' for key, content_hash, _ in entries))}"
+    logger.info(f"Built lore manifest {version} with {len(entries)} entries")
+    return version, tuple(entries)
+
+
+def parse_known_entries(body):
+    """Validate a POSTed {"entries": {key: hash}} map; raises ValueError with a client-facing message."""
+    known = body.get("entries") if isinstance(body, dict) else None
+    if not isinstance(known, dict) or not all(isinstance(k, str) and isinstance(v, str) for k, v in known.items()):
+        raise ValueError('Body must be {"entries": {"<key>": "<hash>", ...}}')
+    return known
+
+
+def export_lore(since=None, known=None):
+    """
+    Yield NDJSON lines: a snapshot header, then the selected entries.
+    `since` is a snapshot version: when it is current nothing is sent, otherwise
+    everything is. `known` is a {key: hash} map: only entries that are missing
+    from it or hashed differently are sent.
+    """
+    version, entries = load_lore_manifest()
+
+    if known is not None:
+        selected = [e for e in entries if known.get(e[0]) != e[1]]
+        current_keys = {e[0] for e in entries}
+        removed = sorted(key for key in known if key not in current_keys)
+    elif since == version:
+        selected, removed = [], []
+    else:
+        selected, removed = entries, []
+
+    header = OrderedDict([
+        ("type", "snapshot"),
+        ("version", version),
+        ("since", since),
+        ("full", known is None and since != version),
+        ("entries", len(entries)),
+        ("changed", len(selected)),
+        ("removed", removed),
+        # Clients drop any local entry whose key is not listed here
+        ("keys", [e[0] for e in entries])
+    ])
+    yield json.dumps(header, ensure_ascii=False) + "\n"
+    for _, _, line in selected:
+        yield line + "\n"
@@ -0,0 +1,192 @@
+import logging
+from collections import deque
+from functools import lru_cache
+
+from .lore_utils import load_lore_file
+
+logger = logging.getLogger(__name__)
+
+NODE_KINDS = ("race", "faction", "location", "place", "class")
+MAX_DEPTH = 4
+
+
+def normalize_name(name):
+    """Case-insensitive key that also treats 'The X' and 'X' as the same entity."""
+    key = " ".join(str(name).lower().replace("’", "'").split())
+    return key[4:] if key.startswith("the ") else key
+
+
+class LoreGraph:
+    """
+    Adjacency index over every cross-reference in the lore files.
+    Nodes are (kind, name) pairs stored by integer id; each adjacency entry is a
+    tuple of (neighbour id, relation, note, outgoing) and is walked both ways.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.index = {}
+        self.adjacency = []
+        self.labels = ()
+
+    def add_node(self, kind, name):
+        key = (kind, normalize_name(name))
+        if key not in self.index:
+            self.index[key] = len(self.nodes)
+            self.nodes.append((kind, name))
+            self.adjacency.append([])
+        return self.index[key]
+
+    def add_edge(self, source, target, relation, note=None):
+        if source == target:
+            return
+        self.adjacency[source].append((target, relation, note, True))
+        self.adjacency[target].append((source, relation, note, False))
+
+    def freeze(self):
+        self.nodes = tuple(self.nodes)
+        self.adjacency = tuple(tuple(edges) for edges in self.adjacency)
+        # Shared, pre-built descriptions so queries only assemble references
+        self.labels = tuple({"kind": kind, "name": name} for kind, name in self.nodes)
+        return self
+
+    def find(self, name, kind=None):
+        """Look up a node by name, optionally restricted to one kind; returns its id or None."""
+        kinds = [kind] if kind else NODE_KINDS
+        for k in kinds:
+            node_id = self.index.get((k, normalize_name(name)))
+            if node_id is not None:
+                return node_id
+        return None
+
+    def describe(self, node_id):
+        return self.labels[node_id]
+
+    def describe_edge(self, node_id, edge):
+        target, relation, note, outgoing = edge
+        source, target = (node_id, target) if outgoing else (target, node_id)
+        described = {"from": self.labels[source], "to": self.labels[target], "relation": relation}
+        if note:
+            described["note"] = note
+        return described
+
+    def neighbourhood(self, node_id, depth=1):
+        """Every node within `depth` hops, plus every edge between those nodes."""
+        distances = {node_id: 0}
+        queue = deque([node_id])
+        while queue:
+            current = queue.popleft()
+            if distances[current] == depth:
+                continue
+            for edge in self.adjacency[current]:
+                if edge[0] not in distances:
+                    distances[edge[0]] = distances[current] + 1
+                    queue.append(edge[0])
+
+        nodes = [
+            {"kind": self.nodes[node][0], "name": self.nodes[node][1], "distance": distance}
+            for node, distance in sorted(distances.items(), key=lambda item: item[1])
+        ]
+
+        # Each edge is stored on both endpoints; report it once, from its outgoing side
+        edges = [
+            self.describe_edge(node, edge)
+            for node in distances
+            for edge in self.adjacency[node]
+            if edge[3] and edge[0] in distances
+        ]
+        return nodes, edges
+
+    def shortest_path(self, source, target):
+        """Breadth-first search; returns the list of edge steps, or None if unconnected."""
+        if source == target:
+            return []
+        previous = {source: None}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            for edge in self.adjacency[current]:
+                nxt = edge[0]
+                if nxt in previous:
+                    continue
+                previous[nxt] = (current, edge)
+                if nxt == target:
+                    steps = []
+                    node = target
+                    while previous[node] is not None:
+                        parent, via = previous[node]
+                        steps.append(self.describe_edge(parent, via))
+                        node = parent
+                    return list(reversed(steps))
+                queue.append(nxt)
+        return None
+
+
+def race_names_in(text, race_names):
+    return [r for r in race_names if r.lower() in text.lower()]
+
+
+@lru_cache(maxsize=1)
+def load_lore_graph():
+    """Compile every lore file's cross-references into a LoreGraph, once."""
+    graph = LoreGraph()
+    races = load_lore_file("race") or {}
+    factions = load_lore_file("faction") or []
+    locations = load_lore_file("location") or []
+    classes = load_lore_file("class") or []
+
+    # Register every entity that has its own lore entry first so names resolve to the right kind
+    race_names = list(races.keys())
+    for name in race_names:
+        graph.add_node("race", name)
+    for entry in factions:
+        graph.add_node("faction", entry["name"])
+    for entry in locations:
+        graph.add_node("location", entry["region_name"])
+    for entry in classes:
+        graph.add_node("class", entry["name"])
+
+    def race_or_faction(name):
+        node_id = graph.find(name, "race")
+        return node_id if node_id is not None else graph.add_node("faction", name)
+
+    for entry in factions:
+        faction = graph.find(entry["name"], "faction")
+        for ally in entry.get("allies", []):
+            graph.add_edge(faction, graph.add_node("faction", ally), "ally")
+        for rival in entry.get("rivals", []):
+            graph.add_edge(faction, graph.add_node("faction", rival), "rival")
+        for other, note in entry.get("relationships", {}).items():
+            graph.add_edge(faction, race_or_faction(other), "relationship", note)
+
+    for entry in locations:
+        location = graph.find(entry["region_name"], "location")
+        native = entry.get("native_race")
+        if native:
+            graph.add_edge(location, graph.add_node("race", native), "native_race")
+        for place in entry.get("major_places") or []:
+            place_name = place.get("place_name") if isinstance(place, dict) else place
+            if place_name:
+                note = place.get("description") if isinstance(place, dict) else None
+                graph.add_edge(location, graph.add_node("place", place_name), "major_place", note)
+
+    for name, entry in races.items():
+        race = graph.find(name, "race")
+        native_land = entry.get("native_land")
+        if native_land:
+            location = graph.find(native_land, "location")
+            if location is None:
+                location = graph.add_node("location", native_land)
+            graph.add_edge(race, location, "native_land")
+        for faction_name in entry.get("factions", []):
+            graph.add_edge(race, graph.add_node("faction", faction_name), "faction")
+
+        views = entry.get("diplomacy", {}).get("view_of_other_races", {})
+        for label, note in views.items():
+            # Keys are either a race name or a grouping label whose text names the races
+            targets = [label] if graph.find(label, "race") is not None else race_names_in(str(note), race_names)
+            for target in targets:
+                graph.add_edge(race, graph.find(target, "race"), "view_of", note)
+
+    logger.debug(f"Compiled lore graph with {len(graph.nodes)} nodes")
+    return graph.freeze()
@@ -3,6 +3,7 @@ from pathlib import Path
 from collections import OrderedDict
 from functools import lru_cache
 import json
+from .records import intern_strings, record_memory
 
 logger = logging.getLogger(__name__)
 LORE_DIR = Path(__file__).resolve().parent / 'data'
@@ -31,7 +32,7 @@ def load_lore_file(lore_type):
 
     try:
         with path.open("r", encoding="utf-8") as file:
-            return json.load(file)
+            return record_memory(filename, intern_strings(json.load(file)))
     except Exception as e:
         logger.exception(f"Failed to load lore file '{filename}': {e}")
         return {}
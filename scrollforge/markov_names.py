@@ -0,0 +1,94 @@
+import logging
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+
+from .rng import thread_rng
+
+logger = logging.getLogger(__name__)
+
+ORDER = 3
+START = "\x02"
+END = "\x03"
+MAX_ATTEMPTS = 25
+MIN_LENGTH = 3
+
+# Races without any names in names.json learn from every race's names combined
+COMMON_MODEL = "*"
+
+
+class NameModel:
+    """
+    Character n-gram model for one race.
+    Each context maps to (next characters, cumulative probabilities) so a draw is one bisect.
+    """
+    __slots__ = ("transitions", "existing", "max_length")
+
+    def __init__(self, names, order=ORDER):
+        counts = {}
+        for name in names:
+            padded = START * order + name + END
+            for i in range(order, len(padded)):
+                context = padded[i - order:i]
+                following = counts.setdefault(context, {})
+                following[padded[i]] = following.get(padded[i], 0) + 1
+
+        self.transitions = {}
+        for context, following in counts.items():
+            symbols = "".join(sorted(following))
+            total = sum(following.values())
+            cumulative = array("d")
+            running = 0
+            for symbol in symbols:
+                running += following[symbol]
+                cumulative.append(running / total)
+            self.transitions[context] = (symbols, cumulative)
+
+        self.existing = frozenset(names)
+        self.max_length = max((len(n) for n in names), default=12) + 2
+
+    def sample(self, rng, order=ORDER):
+        context = START * order
+        chars = []
+        while len(chars) < self.max_length:
+            symbols, cumulative = self.transitions[context]
+            # min() guards against the last cumulative value rounding to just under 1.0
+            symbol = symbols[min(bisect_right(cumulative, rng.random()), len(symbols) - 1)]
+            if symbol == END:
+                break
+            chars.append(symbol)
+            context = context[1:] + symbol
+        return "".join(chars)
+
+
+@lru_cache(maxsize=1)
+def load_name_models():
+    """Train one model per race from names.json, once."""
+    from .generator import load_content_pools
+
+    names_by_race = load_content_pools()["names"]
+    models = {race: NameModel(names) for race, names in names_by_race.items() if names}
+    all_names = [n for names in names_by_race.values() for n in names]
+    models[COMMON_MODEL] = NameModel(all_names)
+    logger.info(f"Trained name models for {len(models) - 1} races")
+    return models
+
+
+def synthesize_name(race_name, rng=None, exclude_existing=False):
+    """
+    Sample a new race-flavoured name. With exclude_existing, names already in
+    names.json are rejected (falls back to the last sample after MAX_ATTEMPTS).
+    """
+    rng = rng or thread_rng()
+    models = load_name_models()
+    model = models.get(race_name) or models[COMMON_MODEL]
+
+    name = ""
+    for _ in range(MAX_ATTEMPTS):
+        name = model.sample(rng)
+        if len(name) < MIN_LENGTH:
+            continue
+        if exclude_existing and name in model.existing:
+            continue
+        return name
+    return name or "Nameless Wanderer"
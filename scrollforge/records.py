@@ -0,0 +1,140 @@
+import sys
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Approximate in-memory size of each loaded data file, filled in by the loaders
+LOADED_SIZES = {}
+
+_record_types = {}
+
+
+class Record:
+    """
+    Compact, read-only record backed by __slots__.
+    Supports the dict-style access the generator and filters use (record["name"], record.get(...)).
+    """
+    __slots__ = ()
+    _fields = ()
+
+    def __getitem__(self, key):
+        # Only declared fields: never hand back a method such as record["items"]
+        if key not in self._fields:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key not in self._fields:
+            return default
+        return getattr(self, key, default)
+
+    def __contains__(self, key):
+        return key in self._fields and hasattr(self, key)
+
+    def keys(self):
+        return [f for f in self._fields if hasattr(self, f)]
+
+    def items(self):
+        return [(f, getattr(self, f)) for f in self.keys()]
+
+    def to_dict(self):
+        return {f: to_plain(v) for f, v in self.items()}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+def record_type(name, fields):
+    """Return a cached Record subclass with one slot per field."""
+    key = (name, tuple(fields))
+    if key not in _record_types:
+        _record_types[key] = type(name, (Record,), {"__slots__": tuple(fields), "_fields": tuple(fields)})
+    return _record_types[key]
+
+
+def intern_strings(value, freeze=False):
+    """
+    Recursively intern every string in loaded JSON so repeated names share one object.
+    With freeze=True, lists are also turned into tuples.
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {sys.intern(k): intern_strings(v, freeze) for k, v in value.items()}
+    if isinstance(value, list):
+        items = [intern_strings(v, freeze) for v in value]
+        return tuple(items) if freeze else items
+    return value
+
+
+def to_records(name, items):
+    """Convert a list of uniform JSON objects into a tuple of slotted records."""
+    fields = []
+    for item in items:
+        for key in item:
+            if key not in fields:
+                fields.append(key)
+
+    if not all(isinstance(f, str) and f.isidentifier() for f in fields):
+        logger.warning(f"Cannot build {name} records from fields {fields}; keeping plain dicts")
+        return tuple(items)
+    # A field named like a Record method (items, keys, get, to_dict...) would shadow it
+    reserved = [f for f in fields if hasattr(Record, f)]
+    if reserved:
+        logger.warning(f"Cannot build {name} records: fields {reserved} clash with Record methods; keeping plain dicts")
+        return tuple(items)
+
+    cls = record_type(name, fields)
+    records = []
+    for item in items:
+        record = cls()
+        for key, value in item.items():
+            setattr(record, key, value)
+        records.append(record)
+    return tuple(records)
+
+
+def to_plain(value):
+    """Convert records and tuples back to dicts and lists at the serialization boundary."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {k: to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(v) for v in value]
+    return value
+
+
+def deep_sizeof(value, seen=None):
+    """Approximate memory held by a loaded structure, counting shared objects once."""
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(deep_sizeof(v, seen) for v in value)
+    elif isinstance(value, Record):
+        size += sum(deep_sizeof(v, seen) for _, v in value.items())
+    return size
+
+
+def record_memory(filename, value):
+    size = deep_sizeof(value)
+    LOADED_SIZES[filename] = size
+    logger.debug(f"Loaded {filename}: ~{size} bytes in memory")
+    return value
+
+
+def memory_report():
+    """Per-file memory use of everything loaded so far, largest first."""
+    report = dict(sorted(LOADED_SIZES.items(), key=lambda item: item[1], reverse=True))
+    report["total"] = sum(LOADED_SIZES.values())
+    return report
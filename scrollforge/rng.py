@@ -0,0 +1,20 @@
+import random
+import threading
+
+_local = threading.local()
+
+
+def thread_rng():
+    """
+    Random instance owned by the current thread.
+    Used when a caller does not pass its own RNG, so threads never share generator state.
+    """
+    rng = getattr(_local, "rng", None)
+    if rng is None:
+        rng = _local.rng = random.Random()
+    return rng
+
+
+def request_rng(seed=None):
+    """Fresh Random instance for a single request; seeded for reproducible output."""
+    return random.Random(seed)
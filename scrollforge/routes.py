@@ -1,9 +1,13 @@
-from flask import Blueprint, request, Response, jsonify
+from flask import Blueprint, request, Response, jsonify, current_app, stream_with_context, url_for
 import logging
 import json
-import random
 from collections import OrderedDict
-from .generator import generate_character
+from .generator import generate_character, resolve_overrides
+from .rng import thread_rng
+from .stats import outcome_distribution
+from .lore_export import export_lore, parse_known_entries
+from .lore_graph import load_lore_graph, NODE_KINDS, MAX_DEPTH
+from .character_id import data_snapshot_version, decode_character_id, parse_seed, SEED_BITS
 from .lore_utils import (
     load_lore_file,
     format_race_lore_entry,
@@ -16,6 +20,24 @@ from .lore_utils import (
 logger = logging.getLogger(__name__)
 main = Blueprint('main', __name__)
 
+BATCH_MAX_ITEMS = 1000
+BATCH_MAX_ITEM_COUNT = 1000
+BATCH_MAX_TOTAL = 10000
+
+# A character id names its data snapshot, so /character/<id> never changes
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# A seeded /generate URL does not name the snapshot: caches must revalidate against the id ETag
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def normalize_override_params(params):
+    """Lowercase override keys and title-case the name-like values, as /custom_generate does."""
+    raw_params = {k.lower(): v for k, v in params.items()}
+    return {
+        k: v.title() if k in ["race", "class", "faction", "gender"] and isinstance(v, str) else v
+        for k, v in raw_params.items()
+    }
+
 
 @main.route('/', methods=['GET'])
 def welcome():
@@ -27,14 +49,46 @@ def welcome():
     )
 
 
+def character_response(character, cache_control=None):
+    response = Response(
+        json.dumps(character, indent=2, ensure_ascii=False, sort_keys=False),
+        mimetype="application/json"
+    )
+    if cache_control and "error" not in character:
+        response.headers["Cache-Control"] = cache_control
+        response.headers["Content-Location"] = url_for("main.character_by_id", character_id=character["id"])
+        response.set_etag(character["id"])
+        response.make_conditional(request)
+    return response
+
+
+def run_generation(overrides=None, seed=None):
+    """Generate one character, through the micro-batcher when it is enabled."""
+    batcher = current_app.extensions.get("scrollforge_batcher")
+    if batcher:
+        return batcher.submit(overrides, seed)
+    return generate_character(overrides=overrides, seed=seed)
+
+
+def seed_error(message):
+    return Response(
+        json.dumps({"error": message}, indent=2, ensure_ascii=False, sort_keys=False),
+        mimetype="application/json",
+        status=400
+    )
+
+
 @main.route('/generate', methods=['GET'])
 def generate():
     try:
-        character = generate_character()
-        return Response(
-            json.dumps(character, indent=2, ensure_ascii=False, sort_keys=False),
-            mimetype="application/json"
-        )
+        seed_param = request.args.get("seed")
+        try:
+            seed = parse_seed(seed_param) if seed_param is not None else None
+        except ValueError:
+            return seed_error("Seed must be an integer between 0 and 2^64 - 1")
+
+        character = run_generation(seed=seed)
+        return character_response(character, cache_control=REVALIDATE_CACHE_CONTROL if seed is not None else None)
     except Exception as e:
         logger.exception("Uncaught error during /generate")
         return Response(
@@ -47,16 +101,15 @@ def generate():
 @main.route('/custom_generate', methods=['GET'])
 def custom_generate():
     try:
-        raw_params = {k.lower(): v for k, v in request.args.items()}
-        overrides = {
-            k: v.title() if k in ["race", "class", "faction", "gender"] else v
-            for k, v in raw_params.items()
-        }
-        character = generate_character(overrides=overrides)
-        return Response(
-            json.dumps(character, indent=2, ensure_ascii=False, sort_keys=False),
-            mimetype="application/json"
-        )
+        overrides = normalize_override_params(request.args)
+        seed_param = overrides.pop("seed", None)
+        try:
+            seed = parse_seed(seed_param) if seed_param is not None else None
+        except ValueError:
+            return seed_error("Seed must be an integer between 0 and 2^64 - 1")
+
+        character = run_generation(overrides=overrides, seed=seed)
+        return character_response(character, cache_control=REVALIDATE_CACHE_CONTROL if seed is not None else None)
     except Exception as e:
         logger.exception("Custom generation failed at /custom_generate")
         return Response(
@@ -69,32 +122,62 @@ def custom_generate():
         )
 
 
+@main.route('/character/<character_id>', methods=['GET'])
+def character_by_id(character_id):
+    try:
+        snapshot, seed, overrides = decode_character_id(character_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if snapshot != data_snapshot_version():
+        return jsonify({
+            "error": "This character was generated from a different data snapshot and cannot be regenerated.",
+            "snapshot": snapshot,
+            "current_snapshot": data_snapshot_version()
+        }), 410
+
+    try:
+        resolved = resolve_overrides(overrides)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    character = generate_character(resolved=resolved, seed=seed)
+    if "error" in character:
+        return Response(
+            json.dumps(character, indent=2, ensure_ascii=False, sort_keys=False),
+            mimetype="application/json",
+            status=500
+        )
+    return character_response(character, cache_control=IMMUTABLE_CACHE_CONTROL)
+
+
 @main.route('/lore', methods=['GET'])
 def random_lore():
     try:
-        lore_type = random.choice(['race', 'class', 'faction', 'location'])
+        rng = thread_rng()
+        lore_type = rng.choice(['race', 'class', 'faction', 'location'])
 
         if lore_type == "race":
             data = load_lore_file("race")
-            name = random.choice(list(data.keys()))
+            name = rng.choice(list(data.keys()))
             entry = data[name]
             formatted = format_race_lore_entry(name, entry)
 
         elif lore_type == "class":
             data = load_lore_file("class")
-            entry = random.choice(data)
+            entry = rng.choice(data)
             name = entry.get("name", "Unknown Class")
             formatted = format_class_lore_entry(name, entry)
 
         elif lore_type == "faction":
             data = load_lore_file("faction")
-            entry = random.choice(data)
+            entry = rng.choice(data)
             name = entry.get("name", "Unknown Faction")
             formatted = format_faction_lore_entry(name, entry)
 
         elif lore_type == "location":
             data = load_location_lore()
-            entry = random.choice(data)
+            entry = rng.choice(data)
             formatted = format_location_lore_entry(entry)
 
         return Response(
@@ -114,6 +197,7 @@ def random_lore():
 @main.route('/lore/race', methods=['GET'])
 @main.route('/race', methods=['GET'])
 def random_race():
+    rng = thread_rng()
     lore_data = load_lore_file("race")
     if not lore_data or not isinstance(lore_data, dict):
         return Response(
@@ -122,7 +206,7 @@ def random_race():
             mimetype="application/json"
         )
 
-    name = random.choice(list(lore_data.keys()))
+    name = rng.choice(list(lore_data.keys()))
     entry = lore_data[name]
     formatted = format_race_lore_entry(name, entry)
 
@@ -156,6 +240,7 @@ def lore_race(name):
 @main.route('/lore/class', methods=['GET'])
 @main.route('/class', methods=['GET'])
 def random_class():
+    rng = thread_rng()
     lore_data = load_lore_file("class")
     if not lore_data or not isinstance(lore_data, list):
         return Response(
@@ -164,7 +249,7 @@ def random_class():
             mimetype="application/json"
         )
 
-    entry = random.choice(lore_data)
+    entry = rng.choice(lore_data)
     name = entry.get("name", "Unknown Class")
     formatted = format_class_lore_entry(name, entry)
 
@@ -200,6 +285,7 @@ def lore_class(name):
 @main.route('/lore/faction', methods=['GET'])
 @main.route('/faction', methods=['GET'])
 def random_faction():
+    rng = thread_rng()
     lore_data = load_lore_file("faction")
 
     if not lore_data or not isinstance(lore_data, list):
@@ -209,7 +295,7 @@ def random_faction():
             mimetype="application/json"
         )
 
-    entry = random.choice(lore_data)
+    entry = rng.choice(lore_data)
     name = entry.get("name", "Unknown Faction")
     formatted = format_faction_lore_entry(name, entry)
 
@@ -245,10 +331,11 @@ def lore_faction(name):
 @main.route('/lore/location', methods=['GET'])
 @main.route('/location', methods=['GET'])
 def get_random_location():
+    rng = thread_rng()
     data = load_location_lore()
     if not data:
         return jsonify({"error": "No location lore data found."}), 404
-    selected = random.choice(data)
+    selected = rng.choice(data)
     formatted = format_location_lore_entry(selected)
     return Response(
         json.dumps(formatted, indent=2, ensure_ascii=False, sort_keys=False),
@@ -274,6 +361,90 @@ def get_location_by_name(location_name):
 
 
 
+@main.route('/lore/export', methods=['GET', 'POST'])
+def lore_export():
+    since = request.args.get("since")
+    known = None
+    if request.method == "POST":
+        try:
+            known = parse_known_entries(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    return Response(
+        stream_with_context(export_lore(since, known)),
+        mimetype="application/x-ndjson"
+    )
+
+
+def find_graph_node(graph, reference):
+    """Resolve 'kind:name' or a bare name to a graph node id."""
+    kind, _, name = reference.partition(":")
+    if name and kind.lower() in NODE_KINDS:
+        return graph.find(name, kind.lower())
+    return graph.find(reference)
+
+
+@main.route('/lore/graph/path', methods=['GET'])
+def lore_graph_path():
+    source_ref = request.args.get("from", "")
+    target_ref = request.args.get("to", "")
+    if not source_ref or not target_ref:
+        return jsonify({"error": "Both 'from' and 'to' are required, e.g. ?from=race:Ashkai&to=faction:The Hollow Coin"}), 400
+
+    graph = load_lore_graph()
+    source = find_graph_node(graph, source_ref)
+    target = find_graph_node(graph, target_ref)
+    if source is None or target is None:
+        missing = source_ref if source is None else target_ref
+        return jsonify({"error": f"No lore entity found named '{missing}'"}), 404
+
+    steps = graph.shortest_path(source, target)
+    if steps is None:
+        return jsonify({"error": f"No relationship path between '{source_ref}' and '{target_ref}'"}), 404
+
+    response_data = OrderedDict([
+        ("from", graph.describe(source)),
+        ("to", graph.describe(target)),
+        ("length", len(steps)),
+        ("path", steps)
+    ])
+    return Response(
+        json.dumps(response_data, indent=2, ensure_ascii=False, sort_keys=False),
+        mimetype="application/json"
+    )
+
+
+@main.route('/lore/graph/<kind>/<name>', methods=['GET'])
+def lore_graph_neighbourhood(kind, name):
+    if kind.lower() not in NODE_KINDS:
+        return jsonify({"error": f"Unknown lore kind '{kind}', expected one of {', '.join(NODE_KINDS)}"}), 400
+
+    try:
+        depth = int(request.args.get("depth", 1))
+        if depth < 1 or depth > MAX_DEPTH:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": f"Depth must be an integer between 1 and {MAX_DEPTH}"}), 400
+
+    graph = load_lore_graph()
+    node = graph.find(name, kind.lower())
+    if node is None:
+        return jsonify({"error": f"No {kind.lower()} found named '{name}'"}), 404
+
+    nodes, edges = graph.neighbourhood(node, depth)
+    response_data = OrderedDict([
+        ("node", graph.describe(node)),
+        ("depth", depth),
+        ("nodes", nodes),
+        ("edges", edges)
+    ])
+    return Response(
+        json.dumps(response_data, indent=2, ensure_ascii=False, sort_keys=False),
+        mimetype="application/json"
+    )
+
+
 @main.route('/generate/bulk', methods=['GET'])
 def generate_bulk_from_query():
     try:
@@ -296,6 +467,7 @@ def generate_bulk_from_query():
             parsed_overrides[norm_key] = values
 
         generated = []
+        rng = thread_rng()
 
         for i in range(count):
             overrides = {}
@@ -303,7 +475,7 @@ def generate_bulk_from_query():
                 if i < len(values):
                     val = values[i]
                 else:
-                    val = random.choice(values)
+                    val = rng.choice(values)
 
                 # Convert age if applicable
                 if key == "age":
@@ -337,6 +509,141 @@ def generate_bulk_from_query():
         return jsonify({"error": "Something went wrong"}), 500
 
 
+def parse_batch_item(item):
+    """
+    Split one /generate/batch item into (count, seed, overrides spec).
+    Raises ValueError with a client-facing message.
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Each batch item must be a JSON object")
+
+    spec = {str(k).lower(): v for k, v in item.items()}
+    count = spec.pop("count", 1)
+    if isinstance(count, bool) or not isinstance(count, int) or count < 1 or count > BATCH_MAX_ITEM_COUNT:
+        raise ValueError(f"Count must be an integer between 1 and {BATCH_MAX_ITEM_COUNT}")
+
+    seed = spec.pop("seed", None)
+    if seed is not None:
+        try:
+            if isinstance(seed, bool) or not isinstance(seed, (int, str)):
+                raise ValueError
+            seed = parse_seed(seed)
+        except ValueError:
+            raise ValueError("Seed must be an integer between 0 and 2^64 - 1")
+    return count, seed, spec
+
+
+def resolve_batch_item(spec):
+    """
+    Validate the overrides of one /generate/batch item and resolve them.
+    Returns (overrides, resolved); raises ValueError with a client-facing message.
+    """
+    for key, value in spec.items():
+        if isinstance(value, (dict, list)):
+            raise ValueError(f"Override '{key}' must be a single value")
+
+    overrides = normalize_override_params(spec)
+    resolved = resolve_overrides(overrides)
+
+    # /custom_generate falls back to a random pick for unknown names; a batch reports them per item
+    for key in ("race", "class", "faction", "gender", "celestial_mark"):
+        if overrides.get(key) and not resolved[key]:
+            raise ValueError(f"Unknown {key.replace('_', ' ')}: {overrides[key]}")
+    return overrides, resolved
+
+
+@main.route('/generate/batch', methods=['POST'])
+def generate_batch():
+    try:
+        items = request.get_json(silent=True)
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "Request body must be a non-empty JSON array of override objects"}), 400
+        if len(items) > BATCH_MAX_ITEMS:
+            return jsonify({"error": f"A batch may contain at most {BATCH_MAX_ITEMS} items"}), 400
+
+        # Identical overrides are validated and resolved only once per batch, whatever their count or seed
+        resolved_specs = {}
+        planned = []
+        for item in items:
+            try:
+                count, seed, spec = parse_batch_item(item)
+            except ValueError as e:
+                planned.append(e)
+                continue
+            spec_key = json.dumps(spec, sort_keys=True, default=str)
+            if spec_key not in resolved_specs:
+                try:
+                    resolved_specs[spec_key] = resolve_batch_item(spec)
+                except ValueError as e:
+                    resolved_specs[spec_key] = e
+            resolution = resolved_specs[spec_key]
+            planned.append(resolution if isinstance(resolution, ValueError) else (count, seed) + resolution)
+
+        total = sum(p[0] for p in planned if not isinstance(p, ValueError))
+        if total > BATCH_MAX_TOTAL:
+            return jsonify({"error": f"A batch may generate at most {BATCH_MAX_TOTAL} characters"}), 400
+
+        results = []
+        for index, plan in enumerate(planned):
+            if isinstance(plan, ValueError):
+                results.append(OrderedDict([("index", index), ("error", str(plan))]))
+                continue
+
+            count, seed, overrides, resolved = plan
+            # A seeded item is reproducible: character i gets seed + i, so count 1 matches /custom_generate?seed=
+            seeds = [None] * count if seed is None else [(seed + i) % 2 ** SEED_BITS for i in range(count)]
+            results.append(OrderedDict([
+                ("index", index),
+                ("count", count),
+                ("seed", seed),
+                ("overrides", overrides),
+                ("generated", [generate_character(resolved=resolved, seed=s) for s in seeds])
+            ]))
+
+        response_data = OrderedDict([
+            ("count", total),
+            ("results", results)
+        ])
+
+        return Response(
+            json.dumps(response_data, indent=2, ensure_ascii=False, sort_keys=False),
+            mimetype='application/json'
+        )
+
+    except Exception as e:
+        logger.exception("Batch generation failed at /generate/batch")
+        return jsonify({"error": "Something went wrong"}), 500
+
+
+@main.route('/stats/distribution', methods=['GET'])
+def stats_distribution():
+    try:
+        overrides = normalize_override_params(request.args)
+        overrides.pop("seed", None)
+        try:
+            distribution = outcome_distribution(overrides)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        return Response(
+            json.dumps(distribution, indent=2, ensure_ascii=False, sort_keys=False),
+            mimetype="application/json"
+        )
+    except Exception as e:
+        logger.exception("Distribution calculation failed at /stats/distribution")
+        return jsonify({"error": "Something went wrong"}), 500
+
+
+@main.route('/stats/batching', methods=['GET'])
+def stats_batching():
+    batcher = current_app.extensions.get("scrollforge_batcher")
+    metrics = batcher.metrics() if batcher else {"enabled": False}
+    return Response(
+        json.dumps(metrics, indent=2, ensure_ascii=False, sort_keys=False),
+        mimetype="application/json"
+    )
+
+
 @main.route('/status', methods=['GET'])
 def status():
     return jsonify({"status": "I'm Alive!", "version": "v1"})
\ No newline at end of file
@@ -0,0 +1,127 @@
+import json
+import logging
+from collections import OrderedDict
+from fractions import Fraction
+from functools import lru_cache
+
+from .character_id import data_snapshot_version
+from .filters import (
+    load_rules,
+    load_factions,
+    filter_valid_classes,
+    filter_valid_origins,
+    filter_deities_by_race,
+    get_valid_faction_candidates
+)
+from .generator import load_json, resolve_overrides
+
+logger = logging.getLogger(__name__)
+
+# generate_character() follows the lore rules when rng.random() < 0.90
+LORE_COMPLIANT_RATE = Fraction(9, 10)
+UNAFFILIATED = "Unaffiliated"
+ATTRIBUTES = ("race", "class", "origin", "faction", "deity")
+
+
+def uniform(options):
+    if not options:
+        return []
+    weight = Fraction(1, len(options))
+    return [(option, weight) for option in options]
+
+
+def compute_distribution(overrides=None):
+    """
+    Enumerate the rule tables the way generate_character() walks them and return
+    the exact probability (as a Fraction) of each race, class, origin, faction and
+    deity, plus the probability that generation fails on an empty candidate pool.
+    """
+    rules = load_rules()
+    races = load_json('races.json')
+    classes = load_json('classes.json')
+    locations = load_json('locations.json')
+    factions = load_factions()
+    followers = load_json('follower.json')
+
+    resolved = resolve_overrides(overrides)
+    if resolved["force_random"]:
+        branches = [(False, Fraction(1))]
+    else:
+        branches = [(True, LORE_COMPLIANT_RATE), (False, 1 - LORE_COMPLIANT_RATE)]
+
+    totals = {attribute: {} for attribute in ATTRIBUTES}
+    error = Fraction(0)
+
+    def add(attribute, name, weight):
+        totals[attribute][name] = totals[attribute].get(name, Fraction(0)) + weight
+
+    race_choices = [(resolved["race"], Fraction(1))] if resolved["race"] else uniform(races)
+
+    for compliant, branch_weight in branches:
+        for race, race_weight in race_choices:
+            weight = branch_weight * race_weight
+
+            if resolved["class"]:
+                class_choices = [(resolved["class"], Fraction(1))]
+            else:
+                class_choices = uniform(filter_valid_classes(race, classes, rules) if compliant else classes)
+            if resolved["location"]:
+                origin_choices = [(resolved["location"], Fraction(1))]
+            else:
+                origin_choices = uniform(filter_valid_origins(race, locations, rules) if compliant else locations)
+            if resolved["follower"]:
+                deity_choices = [(resolved["follower"], Fraction(1))]
+            else:
+                deity_choices = uniform(filter_deities_by_race(race, followers, rules) if compliant else followers)
+
+            # random.choice() on an empty pool raises, and the generator returns an error
+            if not class_choices or not origin_choices or not deity_choices:
+                error += weight
+                continue
+
+            add("race", race["name"], weight)
+            for location, p in origin_choices:
+                add("origin", location["name"], weight * p)
+            for follower, p in deity_choices:
+                add("deity", follower["deity"], weight * p)
+
+            for char_class, class_weight in class_choices:
+                class_total = weight * class_weight
+                add("class", char_class["name"], class_total)
+
+                if resolved["faction"]:
+                    add("faction", resolved["faction"]["name"], class_total)
+                    continue
+                # select_faction() shuffles the candidates and picks one: uniform over candidates
+                candidates = uniform(get_valid_faction_candidates(race, char_class, factions, rules))
+                if not candidates:
+                    add("faction", UNAFFILIATED, class_total)
+                for faction, p in candidates:
+                    add("faction", faction["name"], class_total * p)
+
+    return resolved["overrides"], totals, error
+
+
+@lru_cache(maxsize=256)
+def cached_distribution(snapshot, spec):
+    overrides = json.loads(spec)
+    normalized, totals, error = compute_distribution(overrides)
+
+    result = OrderedDict([
+        ("snapshot", snapshot),
+        ("overrides", normalized),
+        ("error", float(error))
+    ])
+    for attribute in ATTRIBUTES:
+        ranked = sorted(totals[attribute].items(), key=lambda item: (-item[1], item[0]))
+        result[attribute] = OrderedDict((name, float(p)) for name, p in ranked)
+    return result
+
+
+def outcome_distribution(overrides=None):
+    """
+    Exact outcome probabilities for a set of overrides, cached per data snapshot.
+    Raises ValueError for overrides generate_character() would reject.
+    """
+    spec = json.dumps(overrides or {}, sort_keys=True, default=str)
+    return cached_distribution(data_snapshot_version(), spec)
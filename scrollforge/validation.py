@@ -0,0 +1,302 @@
+"""
+Load-time data validation and cross-reference compiler.
+
+Checks every reference across scrollforge/data/ once and keeps the results, so
+request-time code can rely on them instead of re-checking on every call:
+backstory templates that cannot be filled are dropped from the pools, faction
+candidates and relationships are precomputed per race and class, and known gaps
+are reported here once rather than logged per character.
+
+    python -m scrollforge.validation          # prints the JSON report, exits 1 on errors
+"""
+import json
+import logging
+import sys
+from collections import OrderedDict
+from functools import lru_cache
+
+from .character_id import data_snapshot_version
+from .filters import (
+    load_rules,
+    load_factions,
+    filter_valid_classes,
+    filter_valid_origins,
+    filter_deities_by_race,
+    get_valid_faction_candidates
+)
+from .generator import load_json, load_content_pools, GENDER_BODY_MODIFIERS
+from .lore_utils import load_lore_file
+from .records import memory_report
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ("error", "warning", "info")
+
+
+def normalize(name):
+    name = str(name).lower().strip()
+    return name[4:] if name.startswith("the ") else name
+
+
+class ValidationResult:
+    """Issues found in the data plus the cross-references compiled while checking them."""
+
+    def __init__(self):
+        self.issues = []
+        self.backstories = {}
+        self.faction_candidates = {}
+        self.faction_relationships = {}
+
+    def add(self, severity, check, file, message, ref=None):
+        issue = OrderedDict([("severity", severity), ("check", check), ("file", file), ("message", message)])
+        if ref is not None:
+            issue["ref"] = ref
+        self.issues.append(issue)
+
+    def count(self, severity):
+        return sum(1 for issue in self.issues if issue["severity"] == severity)
+
+    @property
+    def ok(self):
+        return self.count("error") == 0
+
+    def report(self):
+        ordered = sorted(self.issues, key=lambda issue: SEVERITIES.index(issue["severity"]))
+        return OrderedDict([
+            ("snapshot", data_snapshot_version()),
+            ("ok", self.ok),
+            ("counts", OrderedDict((s, self.count(s)) for s in SEVERITIES)),
+            ("issues", ordered),
+            # Approximate in-memory size of each loaded data file
+            ("memory_bytes", memory_report())
+        ])
+
+
+def check_rule_references(result, rules, races, classes, locations, factions, followers):
+    race_names = {r["name"] for r in races}
+    class_names = {c["name"] for c in classes}
+    location_names = {l["name"] for l in locations}
+    place_names = {p for l in locations for p in l.get("major_places", [])}
+    faction_names = {f["name"] for f in factions}
+    faction_lookup = {normalize(n): n for n in faction_names}
+    deity_names = {f["deity"].lower() for f in followers}
+
+    keyed_by = {
+        "preferred_race_origin": race_names,
+        "preferred_race_class": race_names,
+        "preferred_race_factions": race_names,
+        "preferred_race_deities": race_names,
+        "preferred_class_factions": class_names
+    }
+    for table, known in keyed_by.items():
+        for key in rules.get(table, {}):
+            if key not in known:
+                result.add("warning", "unknown_rule_key", "rules.json", f"{table} has an entry for unknown '{key}'", key)
+
+    def check_factions(table):
+        for key, names in rules.get(table, {}).items():
+            for name in names:
+                if name in faction_names:
+                    continue
+                near = faction_lookup.get(normalize(name))
+                hint = f" (did you mean '{near}'?)" if near else ""
+                result.add("warning", "unknown_faction", "rules.json",
+                           f"{table}[{key}] names faction '{name}' that is not in factions.json{hint}", name)
+
+    check_factions("preferred_race_factions")
+    check_factions("preferred_class_factions")
+
+    for key, names in rules.get("preferred_race_class", {}).items():
+        for name in names:
+            if name not in class_names:
+                result.add("warning", "unknown_class", "rules.json",
+                           f"preferred_race_class[{key}] names class '{name}' that is not in classes.json", name)
+
+    for key, names in rules.get("preferred_race_deities", {}).items():
+        for name in names:
+            if name.lower() not in deity_names:
+                result.add("warning", "unknown_deity", "rules.json",
+                           f"preferred_race_deities[{key}] names deity '{name}' that is not in follower.json", name)
+
+    for key, names in rules.get("preferred_race_origin", {}).items():
+        for name in names:
+            if name not in location_names and name not in place_names:
+                result.add("info", "unknown_origin", "rules.json",
+                           f"preferred_race_origin[{key}] names '{name}', which is neither a region nor a place", name)
+
+    for entry in factions:
+        for relation in ("allies", "rivals"):
+            for name in entry.get(relation, ()):
+                if name not in faction_names:
+                    result.add("info", "external_faction", "factions.json",
+                               f"{entry['name']} lists '{name}' in {relation} but it has no faction entry", name)
+
+
+def check_lore_compliant_pools(result, rules, races, classes, locations, followers):
+    """Races whose lore-compliant pools are empty make 90% of their characters fail."""
+    for race in races:
+        pools = {
+            "class": filter_valid_classes(race, classes, rules),
+            "origin": filter_valid_origins(race, locations, rules),
+            "deity": filter_deities_by_race(race, followers, rules)
+        }
+        for pool, options in pools.items():
+            if not options:
+                result.add("error", "empty_pool", "rules.json",
+                           f"No lore-compliant {pool} exists for race {race['name']}; generation fails for it", race["name"])
+
+
+def compile_factions(result, rules, races, classes, factions):
+    for entry in factions:
+        result.faction_relationships[entry["name"]] = {
+            "allies": tuple(entry.get("allies", ())),
+            "rivals": tuple(entry.get("rivals", ()))
+        }
+
+    for race in races:
+        for char_class in classes:
+            candidates = tuple(get_valid_faction_candidates(race, char_class, factions, rules))
+            result.faction_candidates[(race["name"], char_class["name"])] = candidates
+            if not candidates:
+                result.add("warning", "no_faction_candidates", "rules.json",
+                           f"{race['name']} {char_class['name']} has no valid faction and is always Unaffiliated",
+                           f"{race['name']}/{char_class['name']}")
+
+
+def sample_contexts(races, classes, locations, factions, followers, genders, ages):
+    """One context per gender, shaped exactly like the one generate_character() builds."""
+    age = ages[0] if ages else {"label": "", "min": 0, "description": ""}
+    for gender in genders:
+        yield {
+            "id": "",
+            "name": "Sample",
+            "title": "The Sample",
+            "race": races[0]["name"],
+            "class": classes[0]["name"],
+            "region": locations[0]["name"],
+            "place": "a remote village",
+            "faction": factions[0]["name"] if factions else "Unaffiliated",
+            "celestial_mark": "The Sample Mark",
+            "deity": followers[0]["deity"],
+            "favorite_dish": "bread",
+            "fighting_style": "brawling",
+            "age": {"value": age.get("min", 0), "label": age.get("label", ""), "description": age.get("description", "")},
+            "pronouns": gender["pronouns"]
+        }
+
+
+def compile_backstories(result, pools, contexts):
+    for class_name, templates in pools["backstories"].items():
+        valid = []
+        for index, template in enumerate(templates):
+            try:
+                for context in contexts:
+                    template.format(**context)
+            except (KeyError, IndexError, ValueError, AttributeError) as e:
+                result.add("error", "backstory_template", "backstories.json",
+                           f"{class_name} template #{index} cannot be filled: {e!r}", f"{class_name}[{index}]")
+                continue
+            valid.append(template)
+        result.backstories[class_name] = tuple(valid)
+
+
+def check_content_coverage(result, pools, races, classes, genders):
+    files = {
+        "quotes": "quotes.json",
+        "titles": "titles.json",
+        "fighting_styles": "fighting_styles.json",
+        "backstories": "backstories.json",
+        "names": "names.json"
+    }
+    for pool, missing in pools["missing"].items():
+        for name in missing:
+            result.add("warning", "missing_content", files[pool],
+                       f"No {pool} for {name}; a fallback value is used instead", name)
+
+    body_metrics = load_json("body_metrics.json")
+    class_mods = load_json("class_modifiers.json")
+    for race in races:
+        if race["name"] not in body_metrics:
+            result.add("warning", "missing_body_metrics", "body_metrics.json",
+                       f"No body metrics for {race['name']}; default ranges are used", race["name"])
+    for char_class in classes:
+        if char_class["name"] not in class_mods:
+            result.add("info", "missing_class_modifiers", "class_modifiers.json",
+                       f"No modifiers for {char_class['name']}; no adjustment is applied", char_class["name"])
+    for gender in genders:
+        if gender["label"] not in GENDER_BODY_MODIFIERS:
+            result.add("info", "gender_body_modifiers", "gender.json",
+                       f"No body modifiers for gender '{gender['label']}'; no adjustment is applied", gender["label"])
+
+
+def check_age_ranges(result, ages):
+    ordered = sorted(ages, key=lambda a: a["min"])
+    for group in ordered:
+        if group["min"] > group["max"]:
+            result.add("error", "age_range", "age.json",
+                       f"'{group['label']}' has min {group['min']} above max {group['max']}", group["label"])
+    for previous, current in zip(ordered, ordered[1:]):
+        if current["min"] > previous["max"] + 1:
+            result.add("warning", "age_gap", "age.json",
+                       f"Ages {previous['max'] + 1}-{current['min'] - 1} fall in no group; "
+                       f"age overrides there get a random group", f"{previous['label']}/{current['label']}")
+        elif current["min"] <= previous["max"]:
+            result.add("warning", "age_overlap", "age.json",
+                       f"'{previous['label']}' and '{current['label']}' overlap at {current['min']}-{previous['max']}",
+                       f"{previous['label']}/{current['label']}")
+
+
+def check_lore_coverage(result, races, classes, locations, factions):
+    expected = {
+        "race": ("lore_races.json", [r["name"] for r in races], lambda data: list(data.keys())),
+        "class": ("lore_classes.json", [c["name"] for c in classes], lambda data: [e.get("name") for e in data]),
+        "faction": ("lore_factions.json", [f["name"] for f in factions], lambda data: [e.get("name") for e in data]),
+        "location": ("lore_locations.json", [l["name"] for l in locations], lambda data: [e.get("region_name") for e in data])
+    }
+    for lore_type, (filename, names, lore_names) in expected.items():
+        available = {normalize(n) for n in lore_names(load_lore_file(lore_type) or {}) if n}
+        for name in names:
+            if normalize(name) not in available:
+                result.add("info", "missing_lore", filename, f"No {lore_type} lore entry for {name}", name)
+
+
+@lru_cache(maxsize=1)
+def validate_data():
+    """Run every check once and keep the compiled cross-references."""
+    result = ValidationResult()
+    rules = load_rules()
+    races = load_json('races.json')
+    classes = load_json('classes.json')
+    locations = load_json('locations.json')
+    factions = load_factions()
+    followers = load_json('follower.json')
+    genders = load_json('gender.json')
+    ages = load_json('age.json')
+    pools = load_content_pools()
+
+    check_rule_references(result, rules, races, classes, locations, factions, followers)
+    check_lore_compliant_pools(result, rules, races, classes, locations, followers)
+    compile_factions(result, rules, races, classes, factions)
+    compile_backstories(result, pools, list(sample_contexts(races, classes, locations, factions, followers, genders, ages)))
+    check_content_coverage(result, pools, races, classes, genders)
+    check_age_ranges(result, ages)
+    check_lore_coverage(result, races, classes, locations, factions)
+
+    log = logger.error if not result.ok else logger.info
+    log(f"Data validation: {result.count('error')} errors, {result.count('warning')} warnings, "
+        f"{result.count('info')} notes")
+    memory = memory_report()
+    logger.info(f"Loaded data files hold ~{memory.pop('total') / 1024:.0f} KiB: " +
+                ", ".join(f"{name} {size / 1024:.0f} KiB" for name, size in memory.items()))
+    return result
+
+
+def main(argv=None):
+    report = validate_data().report()
+    json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write("\n")
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
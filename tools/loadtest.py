@@ -0,0 +1,311 @@
+"""
+Local load-test harness for comparing server configurations.
+
+Starts the app under a chosen server model, replays a weighted mix of
+generation and lore requests at a fixed arrival rate, and writes a JSON report
+with throughput, latency percentiles, error rate and per-worker RSS.
+
+    python tools/loadtest.py --server gthread --workers 2 --threads 8 --rate 200 --duration 30
+    python tools/loadtest.py --server sync --workers 4 --rate 100 --out sync-4.json
+
+Latency is measured from each request's scheduled send time, so time spent
+waiting behind a saturated server is counted (no coordinated omission).
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import platform
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MIX = [
+    # (weight, label, path)
+    (35, "generate", "/generate"),
+    (25, "custom_generate", "/custom_generate?race={race}&class={class_name}"),
+    (10, "bulk", "/generate/bulk?count=10"),
+    (10, "lore", "/lore"),
+    (10, "lore_race", "/lore/race/{race}"),
+    (5, "lore_faction", "/lore/faction"),
+    (5, "status", "/status")
+]
+
+RACES = ["Vaelari", "Mirekin", "Thorneth", "Gryxen", "Ashkai", "Thalorin", "Canari", "Brakyr", "Dravok", "Sularin"]
+CLASSES = ["Ironblood", "Runeweaver", "Whispercloak", "Veilpiercer", "Spelltyrant", "Pathstrider", "Gravedigger", "Lifebinder"]
+
+
+def server_threads(server, threads):
+    """Threads per worker the server really runs with (None when the server decides)."""
+    if server == "sync":
+        return 1
+    if server == "gthread":
+        return threads
+    return None
+
+
+def server_command(server, workers, threads, port):
+    bind = f"127.0.0.1:{port}"
+    if server == "sync":
+        # gunicorn.conf.py sets threads = 8, and gunicorn silently turns -k sync into
+        # gthread whenever threads > 1, so pin it to one thread
+        return ["gunicorn", "app:app", "-k", "sync", "-w", str(workers), "--threads", "1", "-b", bind]
+    if server == "gthread":
+        return ["gunicorn", "app:app", "-k", "gthread", "-w", str(workers), "--threads", str(threads), "-b", bind]
+    if server == "asgi":
+        if importlib.util.find_spec("uvicorn") is None:
+            raise SystemExit("ASGI mode needs uvicorn installed (pip install uvicorn)")
+        return [
+            "uvicorn", "app:app", "--interface", "wsgi",
+            "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)
+        ]
+    raise SystemExit(f"Unknown server model: {server}")
+
+
+def wait_until_ready(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+        try:
+            conn.request("GET", "/status")
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        finally:
+            conn.close()
+        time.sleep(0.2)
+    return False
+
+
+def child_pids(pid):
+    """Direct children of a process, read from /proc (Linux only)."""
+    children = []
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The ppid is the second field after the parenthesised command name
+        fields = stat.rsplit(")", 1)[1].split()
+        if int(fields[1]) == pid:
+            children.append(int(entry.name))
+    return children
+
+
+def rss_kb(pid):
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class RssSampler(threading.Thread):
+    """Samples the RSS of every worker under the server process and keeps the peak."""
+
+    def __init__(self, master_pid, interval=0.5):
+        super().__init__(daemon=True)
+        self.master_pid = master_pid
+        self.interval = interval
+        self.peak_kb = {}
+        self.stopped = threading.Event()
+
+    def run(self):
+        if platform.system() != "Linux":
+            return
+        while not self.stopped.is_set():
+            for pid in [self.master_pid] + child_pids(self.master_pid):
+                kb = rss_kb(pid)
+                if kb is not None:
+                    self.peak_kb[pid] = max(kb, self.peak_kb.get(pid, 0))
+            self.stopped.wait(self.interval)
+
+    def report(self):
+        workers = {pid: kb for pid, kb in self.peak_kb.items() if pid != self.master_pid}
+        return {
+            "master_peak_mb": round(self.peak_kb.get(self.master_pid, 0) / 1024, 1),
+            "worker_peak_mb": {str(pid): round(kb / 1024, 1) for pid, kb in sorted(workers.items())},
+            "total_peak_mb": round(sum(self.peak_kb.values()) / 1024, 1)
+        }
+
+
+def build_schedule(mix, rate, duration, seed):
+    """Pre-compute (send_offset, label, path) for an open-loop run at a fixed arrival rate."""
+    rng = random.Random(seed)
+    weights = [m[0] for m in mix]
+    total = int(rate * duration)
+    schedule = []
+    for i in range(total):
+        _, label, template = rng.choices(mix, weights=weights)[0]
+        path = template.format(race=rng.choice(RACES), class_name=rng.choice(CLASSES))
+        schedule.append((i / rate, label, path))
+    return schedule
+
+
+def send(port, path, timeout):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies_ms, errors, count, shed=0):
+    ordered = sorted(latencies_ms)
+    return {
+        "requests": count,
+        "errors": errors,
+        "shed": shed,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 2) if ordered else None,
+        "p95_ms": round(percentile(ordered, 95), 2) if ordered else None,
+        "p99_ms": round(percentile(ordered, 99), 2) if ordered else None,
+        "max_ms": round(ordered[-1], 2) if ordered else None
+    }
+
+
+def run_load(port, schedule, client_threads, timeout):
+    results = []
+    lock = threading.Lock()
+
+    def fire(scheduled_at, label, path):
+        status = None
+        try:
+            status = send(port, path, timeout)
+        except OSError:
+            pass
+        latency_ms = (time.monotonic() - scheduled_at) * 1000
+        with lock:
+            results.append((label, status, latency_ms))
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=client_threads) as pool:
+        for offset, label, path in schedule:
+            scheduled_at = started + offset
+            delay = scheduled_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, scheduled_at, label, path)
+    elapsed = time.monotonic() - started
+    return results, elapsed
+
+
+def build_report(args, results, elapsed, rss):
+    by_route = {}
+    for label, status, latency in results:
+        by_route.setdefault(label, []).append((status, latency))
+
+    def is_error(status):
+        return status is None or status >= 400
+
+    def is_shed(status):
+        return status in (429, 503)
+
+    routes = {
+        label: summarize(
+            [l for _, l in rows], sum(is_error(s) for s, _ in rows), len(rows), sum(is_shed(s) for s, _ in rows)
+        )
+        for label, rows in sorted(by_route.items())
+    }
+    overall = summarize(
+        [l for _, _, l in results], sum(is_error(s) for _, s, _ in results), len(results),
+        sum(is_shed(s) for _, s, _ in results)
+    )
+    completed = sum(not is_error(s) for _, s, _ in results)
+
+    return {
+        "config": {
+            "server": args.server,
+            "workers": args.workers,
+            "threads": server_threads(args.server, args.threads),
+            "target_rps": args.rate,
+            "duration_s": args.duration,
+            "client_threads": args.client_threads,
+            "admission": args.admission,
+            "seed": args.seed
+        },
+        "throughput_rps": round(completed / elapsed, 1) if elapsed else 0.0,
+        "elapsed_s": round(elapsed, 2),
+        "overall": overall,
+        "routes": routes,
+        "rss": rss
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test Scrollforge under a chosen server model.")
+    parser.add_argument("--server", choices=["sync", "gthread", "asgi"], default="gthread")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8, help="threads per worker (gthread only)")
+    parser.add_argument("--rate", type=float, default=100.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of unmeasured load first")
+    parser.add_argument("--client-threads", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0, help="seed for the request mix")
+    parser.add_argument("--admission", action="store_true", help="keep the app's admission control enabled")
+    parser.add_argument("--out", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args(argv)
+
+    command = server_command(args.server, args.workers, args.threads, args.port)
+    env = dict(os.environ)
+    # Admission control would shed most of a single-client load test, so it is opt-in here
+    env.setdefault("SCROLLFORGE_ADMISSION", "1" if args.admission else "0")
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_until_ready(args.port):
+            raise SystemExit(f"Server did not become ready: {' '.join(command)}")
+
+        if args.warmup > 0:
+            run_load(args.port, build_schedule(DEFAULT_MIX, args.rate, args.warmup, args.seed + 1),
+                     args.client_threads, args.timeout)
+
+        sampler = RssSampler(server.pid)
+        sampler.start()
+        results, elapsed = run_load(
+            args.port, build_schedule(DEFAULT_MIX, args.rate, args.duration, args.seed),
+            args.client_threads, args.timeout
+        )
+        sampler.stopped.set()
+        sampler.join()
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    report = build_report(args, results, elapsed, sampler.report())
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.out:
+        Path(args.out).write_text(output + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())